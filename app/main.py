@@ -1,11 +1,18 @@
 """Main application factory and CLI interface."""
 
 import argparse
+import importlib.util
+import json
+import logging
+import logging.config
+import os
 import sys
 from pathlib import Path
 
 import uvicorn
+import uvicorn.config
 from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
 
 from .settings import Settings
@@ -13,6 +20,34 @@ from .state import init_state
 from .routers import core, media, extract, thumbnails_api, root, search, ingest, ingest_v2
 from .services.files import switch_directory
 from .services.thumbnails import start_thumbnail_generation
+from .utils.json_response import FastJSONResponse
+from .utils.process_pool import POOL_WORKERS_ENV_VAR, pool_workers_per_server
+
+
+class _TextGZipMiddleware:
+    """GZip only the API and static asset routes.
+    
+    JSON listings and JS/CSS shrink several-fold; media files are already
+    compressed and are served with Range support, which compressing would
+    break on Starlette versions that don't exclude them. The HTML pages are
+    pre-compressed by their routes. Level 5 gets most of level 9's ratio on
+    this kind of text for a fraction of the CPU time. The filtered export
+    streams a zip, which is left alone for the same reason as media.
+    """
+    
+    PATH_PREFIXES = ("/api/", "/static/", "/themes/")
+    EXCLUDED_PATHS = ("/api/export-filtered",)
+    
+    def __init__(self, app, minimum_size: int = 1024, compresslevel: int = 5):
+        self.app = app
+        self.gzip = GZipMiddleware(app, minimum_size=minimum_size, compresslevel=compresslevel)
+    
+    async def __call__(self, scope, receive, send):
+        if (scope["type"] == "http" and scope["path"].startswith(self.PATH_PREFIXES)
+                and scope["path"] not in self.EXCLUDED_PATHS):
+            await self.gzip(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
 
 
 def create_app(settings: Settings) -> FastAPI:
@@ -22,7 +57,10 @@ def create_app(settings: Settings) -> FastAPI:
     state = init_state(settings)
     
     # Create FastAPI app
-    app = FastAPI(title="Media Scoring Application")
+    app = FastAPI(title="Media Scoring Application", default_response_class=FastJSONResponse)
+    
+    # Compress JSON and static text responses
+    app.add_middleware(_TextGZipMiddleware, minimum_size=1024, compresslevel=5)
     
     # Mount static files
     app.mount("/static", StaticFiles(directory="app/static"), name="static")
@@ -44,6 +82,25 @@ def create_app(settings: Settings) -> FastAPI:
     return app
 
 
+# Worker processes started by uvicorn can't be handed the Settings object,
+# so the CLI passes the merged settings to them through the environment.
+SETTINGS_ENV_VAR = "MEDIA_SCORING_SETTINGS"
+
+
+def create_app_from_env() -> FastAPI:
+    """App factory for multi-worker servers (uvicorn --factory, gunicorn).
+    
+    Uses the settings the CLI exported in MEDIA_SCORING_SETTINGS, or
+    config/config.yml when started by an external process manager.
+    """
+    settings_json = os.environ.get(SETTINGS_ENV_VAR)
+    if settings_json:
+        settings = Settings(**json.loads(settings_json))
+    else:
+        settings = Settings.load_from_yaml()
+    return create_app(settings)
+
+
 def _initialize_app(state):
     """Initialize the application with directory scanning."""
     # Ensure directory is resolved to absolute path
@@ -56,6 +113,17 @@ def _initialize_app(state):
     start_thumbnail_generation(resolved_dir, file_list)
 
 
+def _select_server_backends():
+    """Pick the fastest available uvicorn event loop and HTTP parser.
+    
+    uvloop and httptools come with ``uvicorn[standard]``; fall back to the
+    pure-Python implementations when they are not installed.
+    """
+    loop = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    http = "httptools" if importlib.util.find_spec("httptools") else "h11"
+    return loop, http
+
+
 def cli_main():
     """Command line interface entry point."""
     
@@ -71,6 +139,11 @@ def cli_main():
     parser.add_argument("--dir", type=Path, help="Directory with media files")
     parser.add_argument("--port", type=int, help="Port to serve")
     parser.add_argument("--host", help="Host to bind")
+    parser.add_argument("--access-log", action="store_true", help="Log every HTTP request (off by default)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of server processes (default 1). Each worker keeps its own scan state, "
+                             "so switching directories from the UI only affects the worker that handled it; "
+                             "use several workers with a fixed --dir")
     parser.add_argument("--pattern", help="Glob pattern, union with | (e.g., *.mp4|*.png|*.jpg)")
     parser.add_argument("--style", help="CSS style file from themes folder (e.g., style_default.css, style_pastelcore.css, style_darkpastelcore.css, or style_darkcandy.css)")
     parser.add_argument("--generate-thumbnails", action="store_true", help="Generate thumbnail previews for media files")
@@ -93,6 +166,8 @@ def cli_main():
         overrides['port'] = args.port
     if args.host is not None:
         overrides['host'] = args.host
+    if args.access_log:
+        overrides['access_log'] = True
     if args.pattern is not None:
         overrides['pattern'] = args.pattern
     if args.style is not None:
@@ -128,6 +203,33 @@ def cli_main():
         print(f"Error with settings: {e}", file=sys.stderr)
         sys.exit(1)
     
+    # uvicorn.run applies the same logging config again; doing it here lets
+    # startup messages go through uvicorn's logger in the server's format
+    logging.config.dictConfig(uvicorn.config.LOGGING_CONFIG)
+    logger = logging.getLogger("uvicorn.error")
+    
+    loop, http = _select_server_backends()
+    logger.info(f"Server backends: loop={loop} http={http}")
+    
+    # Application events already go to the per-directory log; the access
+    # log adds a formatted line per request (every Range request while a
+    # video plays), so it is opt-in. Idle connections are kept for 30s
+    # (uvicorn's default is 5s) so the UI's bursts of API calls reuse them.
+    server_options = dict(
+        host=settings.host, port=settings.port, loop=loop, http=http,
+        log_level="info", access_log=settings.access_log, timeout_keep_alive=30,
+    )
+    
+    if args.workers > 1:
+        # Workers are separate processes, so uvicorn needs an import string
+        # for the app and each worker builds its own from the settings.
+        os.environ[SETTINGS_ENV_VAR] = settings.model_dump_json()
+        # Split the cores between the workers' thumbnail and extractor pools
+        os.environ.setdefault(POOL_WORKERS_ENV_VAR, str(pool_workers_per_server(args.workers)))
+        logger.info(f"Starting {args.workers} workers")
+        uvicorn.run("app.main:create_app_from_env", factory=True, workers=args.workers, **server_options)
+        return
+    
     # Create and run the app
     app = create_app(settings)
-    uvicorn.run(app, host=settings.host, port=settings.port, log_level="info")
\ No newline at end of file
+    uvicorn.run(app, **server_options)
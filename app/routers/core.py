@@ -6,6 +6,7 @@ from fastapi.templating import Jinja2Templates
 from fastapi import Request
 
 from ..state import get_state
+from ..utils.cached_page import CachedPage
 
 
 router = APIRouter()
@@ -13,15 +14,13 @@ router = APIRouter()
 # Initialize Jinja2 templates
 templates = Jinja2Templates(directory="app/templates")
 
+# The index page only depends on the theme, which is fixed for the life of
+# the process, so it is rendered, encoded and compressed once per theme.
+_index_page = CachedPage(templates, "index.html")
+
 
 @router.get("/", response_class=HTMLResponse)
 async def index(request: Request):
     """Serve the main application page."""
     state = get_state()
-    return templates.TemplateResponse(
-        "index.html", 
-        {
-            "request": request, 
-            "settings": state.settings
-        }
-    )
\ No newline at end of file
+    return _index_page.response(request, state.settings.style, settings=state.settings)
@@ -1,19 +1,40 @@
 """Extract router for workflow extraction and file export."""
 
-import tempfile
+import asyncio
+import io
+import os
 import zipfile
 from pathlib import Path
-from typing import List
+from typing import Iterator, List, Tuple
 
 from fastapi import APIRouter, HTTPException, Request
-from fastapi.responses import FileResponse
+from fastapi.responses import StreamingResponse
 
 from ..state import get_state
 from ..services.extractor import extract_workflow_for
+from ..services.files import media_extension, resolve_media_path
+from ..utils.json_response import read_json
 
 
 router = APIRouter(prefix="/api")
 
+# Below this many names, resolving each one is cheaper than listing the directory
+_PRESCAN_MIN_NAMES = 8
+
+
+def _regular_files(directory: Path) -> set:
+    """Names of the regular (non-symlink) files in a directory, from one scandir.
+
+    Entry types come from the directory listing itself, so this costs no
+    stat() per file. Symlinks are left out on purpose: they still need
+    resolving to check they stay inside the media directory.
+    """
+    try:
+        with os.scandir(directory) as it:
+            return {e.name for e in it if e.is_file(follow_symlinks=False)}
+    except OSError:
+        return set()
+
 
 @router.post("/extract")
 async def extract_workflows(req: Request):
@@ -22,22 +43,46 @@ async def extract_workflows(req: Request):
     JSON body: { "names": ["file1.mp4", ...] }
     """
     state = get_state()
-    data = await req.json()
+    data = await read_json(req)
     names = data.get("names") or []
     
     if not isinstance(names, list):
         raise HTTPException(400, "names must be a list of filenames")
     
-    results = []
-    for nm in names:
-        vp = (state.video_dir / nm).resolve()
-        try:
-            vp.relative_to(state.video_dir)
-        except Exception:
-            results.append({"name": nm, "status": "error", "error": "forbidden_path"})
-            continue
-        results.append(extract_workflow_for(vp))
+    # Validate every name up front, in one thread hop
+    def _validate():
+        video_dir = state.video_dir
+        regular = _regular_files(video_dir) if len(names) >= _PRESCAN_MIN_NAMES else set()
+        checked = []
+        for nm in names:
+            if nm in regular:
+                # A plain file directly in the media dir: nothing to resolve
+                checked.append(video_dir / nm)
+                continue
+            vp = resolve_media_path(video_dir, nm)
+            try:
+                vp.relative_to(video_dir)
+            except Exception:
+                checked.append({"name": nm, "status": "error", "error": "forbidden_path"})
+            else:
+                checked.append(vp)
+        return checked
     
+    checked = await asyncio.to_thread(_validate)
+    
+    # Run extractors concurrently; the worker pool caps them at one per CPU.
+    # Results keep the order of the request.
+    async def _run(item):
+        if isinstance(item, dict):
+            return item
+        return await extract_workflow_for(item)
+    
+    # One failing file must not take down the rest of the batch
+    results = await asyncio.gather(*[_run(item) for item in checked], return_exceptions=True)
+    for i, (nm, result) in enumerate(zip(names, results)):
+        if isinstance(result, Exception):
+            state.logger.error(f"EXTRACT error file={nm} error={result}")
+            results[i] = {"name": nm, "status": "error", "error": str(result)}
     return {"results": results}
 
 
@@ -48,7 +93,7 @@ async def export_filtered_files(req: Request):
     JSON body: { "names": ["file1.mp4", "file2.png", ...] }
     """
     state = get_state()
-    data = await req.json()
+    data = await read_json(req)
     names = data.get("names") or []
     
     if not isinstance(names, list):
@@ -57,31 +102,85 @@ async def export_filtered_files(req: Request):
     if not names:
         raise HTTPException(400, "No files to export")
     
-    # Create a temporary zip file
-    temp_zip = tempfile.NamedTemporaryFile(delete=False, suffix='.zip')
-    temp_zip.close()
+    # Resolving names touches the filesystem; do it before streaming starts
+    files = await asyncio.to_thread(_export_files, state.video_dir, names)
     
-    try:
-        with zipfile.ZipFile(temp_zip.name, 'w', zipfile.ZIP_DEFLATED) as zf:
-            for name in names:
-                file_path = (state.video_dir / name).resolve()
-                try:
-                    file_path.relative_to(state.video_dir)
-                except Exception:
-                    continue  # Skip forbidden paths
-                
-                if file_path.exists() and file_path.is_file():
-                    # Add file to zip with just the filename (no path)
-                    zf.write(file_path, name)
+    return StreamingResponse(
+        _stream_export_zip(files),
+        media_type="application/zip",
+        headers={"Content-Disposition": "attachment; filename=filtered_media.zip"}
+    )
+
+
+# Read size for copying files into the export archive
+_EXPORT_CHUNK_SIZE = 1 << 20
+
+
+def _export_files(video_dir: Path, names: List[str]) -> List[Tuple[str, Path]]:
+    """(archive name, path) for each requested file inside the media directory."""
+    files = []
+    for name in names:
+        file_path = resolve_media_path(video_dir, name)
+        try:
+            file_path.relative_to(video_dir)
+        except Exception:
+            continue  # Skip forbidden paths
         
-        # Return the zip file
-        return FileResponse(
-            temp_zip.name, 
-            media_type="application/zip", 
-            filename="filtered_media.zip",
-            headers={"Content-Disposition": "attachment; filename=filtered_media.zip"}
-        )
-    except Exception as e:
-        # Clean up temp file on error
-        Path(temp_zip.name).unlink(missing_ok=True)
-        raise HTTPException(500, f"Failed to create zip archive: {str(e)}")
\ No newline at end of file
+        if file_path.is_file():
+            # Add file to zip with just the filename (no path)
+            files.append((name, file_path))
+    return files
+
+
+class _ZipChunks(io.RawIOBase):
+    """Write-only sink that collects what ZipFile writes until it is drained.
+    
+    It is not seekable, so ZipFile writes sizes and CRCs in data
+    descriptors after each file instead of seeking back to the header.
+    """
+    
+    def __init__(self):
+        super().__init__()
+        self._chunks: List[bytes] = []
+    
+    def writable(self) -> bool:
+        return True
+    
+    def write(self, b) -> int:
+        self._chunks.append(bytes(b))
+        return len(b)
+    
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _stream_export_zip(files: List[Tuple[str, Path]]) -> Iterator[bytes]:
+    """Yield a zip archive of the files as it is built, without a temp file.
+    
+    Media formats are already compressed, so they are stored as-is; only
+    anything else is deflated. Starlette runs this sync iterator in its
+    threadpool, so the file reads stay off the event loop.
+    """
+    sink = _ZipChunks()
+    with zipfile.ZipFile(sink, "w") as zf:
+        for name, file_path in files:
+            try:
+                # Sets the size up front, so large files get zip64 headers
+                zinfo = zipfile.ZipInfo.from_file(file_path, name)
+                src = open(file_path, "rb")
+            except OSError:
+                continue  # Removed since the request was made
+            zinfo.compress_type = zipfile.ZIP_STORED if media_extension(name) else zipfile.ZIP_DEFLATED
+            with src, zf.open(zinfo, "w") as dest:
+                while True:
+                    chunk = src.read(_EXPORT_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    dest.write(chunk)
+                    data = sink.drain()
+                    if data:
+                        yield data
+            yield sink.drain()
+    yield sink.drain()
@@ -12,10 +12,13 @@ from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel
 
 from ..state import get_state
+from ..services.files import summarize_subdirectory
+from ..utils.cached_page import CachedPage
 
 
 router = APIRouter()
 templates = Jinja2Templates(directory="app/templates")
+_ingest_page = CachedPage(templates, "ingest.html")
 
 
 class IngestRequest(BaseModel):
@@ -31,13 +34,7 @@ class IngestRequest(BaseModel):
 async def ingest_page(request: Request):
     """Serve the ingest tool page."""
     state = get_state()
-    return templates.TemplateResponse(
-        "ingest.html",
-        {
-            "request": request,
-            "settings": state.settings
-        }
-    )
+    return _ingest_page.response(request, state.settings.style, settings=state.settings)
 
 
 @router.get("/api/ingest/directories")
@@ -62,7 +59,7 @@ async def list_directories_tree(path: str = ""):
             # Path is outside /media/, redirect to media root
             target_path = media_root
         
-        if not target_path.exists() or not target_path.is_dir():
+        if not target_path.is_dir():
             raise HTTPException(404, "Directory not found")
         
         # Get ingestion statistics from database if enabled
@@ -90,36 +87,28 @@ async def list_directories_tree(path: str = ""):
         file_counts = {}
         
         try:
-            for item in sorted(target_path.iterdir(), key=lambda x: x.name.lower()):
+            # scandir gives entry types without a stat per entry
+            with os.scandir(target_path) as it:
+                entries = sorted(it, key=lambda x: x.name.lower())
+            for item in entries:
                 if item.is_dir() and not item.name.startswith('.'):
-                    # Count total media files in this directory
-                    total_files = 0
-                    ingested_files = 0
-                    
-                    try:
-                        for subitem in item.iterdir():
-                            if subitem.is_file():
-                                ext = subitem.suffix.lower()
-                                if ext in ['.mp4', '.png', '.jpg', '.jpeg']:
-                                    total_files += 1
-                    except PermissionError:
-                        pass
+                    # Count media files and look for subdirectories in one pass
+                    total_files, has_children = summarize_subdirectory(item.path)
                     
                     # Get ingested count from database
-                    dir_path = str(item)
+                    dir_path = item.path
                     ingested_files = ingestion_stats.get(dir_path, 0)
                     
                     subdirs.append({
                         "name": item.name,
-                        "path": str(item),
-                        "has_children": any(subitem.is_dir() and not subitem.name.startswith('.') 
-                                           for subitem in item.iterdir()),
+                        "path": item.path,
+                        "has_children": has_children,
                         "total_files": total_files,
                         "ingested_files": ingested_files
                     })
                 elif item.is_file():
                     # Count files by extension
-                    ext = item.suffix.lower()
+                    ext = Path(item.name).suffix.lower()
                     file_counts[ext] = file_counts.get(ext, 0) + 1
         except PermissionError:
             # Handle permission errors gracefully
@@ -172,7 +161,7 @@ async def run_ingest(request: IngestRequest):
             # Validate directory path
             try:
                 dir_path = Path(directory).resolve()
-                if not dir_path.exists() or not dir_path.is_dir():
+                if not dir_path.is_dir():
                     yield f"data: [ERROR] Invalid directory: {directory}\n\n"
                     continue
             except Exception as e:
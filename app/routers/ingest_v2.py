@@ -3,6 +3,7 @@
 import asyncio
 import json
 import logging
+import os
 import tempfile
 import uuid
 from datetime import datetime, timedelta
@@ -17,20 +18,21 @@ from pydantic import BaseModel, Field
 
 from ..state import get_state
 from ..database.service import DatabaseService
-from ..services.files import discover_files, read_score
+from ..services.files import discover_files, read_score, media_extension, summarize_subdirectory
 from ..services.metadata import extract_metadata, extract_keywords_from_metadata
 from ..services.nsfw_detection import detect_image_nsfw, is_nsfw_detection_available
 from ..services.thumbnails import (
     get_thumbnail_path_for,
-    generate_thumbnail_for_image,
-    generate_thumbnail_for_video
+    generate_thumbnail_for
 )
 from ..utils.hashing import compute_media_file_id, compute_perceptual_hash
 from ..utils.sanitization import sanitize_file_data
+from ..utils.cached_page import CachedPage
 
 
 router = APIRouter()
 templates = Jinja2Templates(directory="app/templates")
+_ingest_v2_page = CachedPage(templates, "ingest_v2.html")
 
 # In-memory storage for processing sessions
 processing_sessions: Dict[str, Dict] = {}
@@ -256,13 +258,12 @@ class CommitRequest(BaseModel):
 async def ingest_v2_page(request: Request):
     """Serve the enhanced ingest tool page."""
     state = get_state()
-    return templates.TemplateResponse(
-        "ingest_v2.html",
-        {
-            "request": request,
-            "settings": state.settings,
-            "nsfw_detection_available": is_nsfw_detection_available()
-        }
+    nsfw_available = is_nsfw_detection_available()
+    return _ingest_v2_page.response(
+        request,
+        (state.settings.style, nsfw_available),
+        settings=state.settings,
+        nsfw_detection_available=nsfw_available,
     )
 
 
@@ -283,15 +284,15 @@ async def get_file_types_in_directories(directories: List[str]):
                 # Path is outside /media/, skip it
                 continue
             
-            if not directory.exists() or not directory.is_dir():
+            if not directory.is_dir():
                 continue
             
             try:
                 for item in directory.iterdir():
-                    if item.is_file():
-                        ext = item.suffix.lower()
-                        if ext in ['.mp4', '.png', '.jpg', '.jpeg']:
-                            file_types.add(ext)
+                    # Check the name first; only media files need a stat
+                    ext = media_extension(item.name)
+                    if ext and ext not in file_types and item.is_file():
+                        file_types.add(ext)
             except PermissionError:
                 pass
         
@@ -325,7 +326,7 @@ async def list_directories_tree(path: str = ""):
             # Path is outside /media/, redirect to media root
             target_path = media_root
         
-        if not target_path.exists() or not target_path.is_dir():
+        if not target_path.is_dir():
             raise HTTPException(404, "Directory not found")
         
         # Get ingestion statistics from database if enabled
@@ -353,35 +354,27 @@ async def list_directories_tree(path: str = ""):
         file_counts = {}
         
         try:
-            for item in sorted(target_path.iterdir(), key=lambda x: x.name.lower()):
+            # scandir gives entry types without a stat per entry
+            with os.scandir(target_path) as it:
+                entries = sorted(it, key=lambda x: x.name.lower())
+            for item in entries:
                 if item.is_dir() and not item.name.startswith('.'):
-                    # Count total media files in this directory
-                    total_files = 0
-                    ingested_files = 0
-                    
-                    try:
-                        for subitem in item.iterdir():
-                            if subitem.is_file():
-                                ext = subitem.suffix.lower()
-                                if ext in ['.mp4', '.png', '.jpg', '.jpeg']:
-                                    total_files += 1
-                    except PermissionError:
-                        pass
+                    # Count media files and look for subdirectories in one pass
+                    total_files, has_children = summarize_subdirectory(item.path)
                     
                     # Get ingested count from database
-                    dir_path = str(item)
+                    dir_path = item.path
                     ingested_files = ingestion_stats.get(dir_path, 0)
                     
                     subdirs.append({
                         "name": item.name,
-                        "path": str(item),
-                        "has_children": any(subitem.is_dir() and not subitem.name.startswith('.') 
-                                           for subitem in item.iterdir()),
+                        "path": item.path,
+                        "has_children": has_children,
                         "total_files": total_files,
                         "ingested_files": ingested_files
                     })
                 elif item.is_file():
-                    ext = item.suffix.lower()
+                    ext = Path(item.name).suffix.lower()
                     file_counts[ext] = file_counts.get(ext, 0) + 1
         except PermissionError:
             pass
@@ -438,7 +431,7 @@ async def start_processing(request: ProcessRequest, background_tasks: Background
     validated_dirs = []
     for dir_path in directories_to_process:
         directory = Path(dir_path).expanduser().resolve()
-        if not directory.exists() or not directory.is_dir():
+        if not directory.is_dir():
             raise HTTPException(400, f"Directory not found: {directory}")
         validated_dirs.append(directory)
     
@@ -911,20 +904,12 @@ def _commit_single_file(db: DatabaseService, file_data: Dict, parameters: Dict)
                 # Generate regular thumbnail (64px default)
                 thumb_path = get_thumbnail_path_for(file_path, large=False)
                 if not thumb_path.exists():
-                    name_lower = file_path.name.lower()
-                    if name_lower.endswith(('.png', '.jpg', '.jpeg')):
-                        generate_thumbnail_for_image(file_path, thumb_path, height=state.settings.thumbnail_height)
-                    elif name_lower.endswith('.mp4'):
-                        generate_thumbnail_for_video(file_path, thumb_path, height=state.settings.thumbnail_height)
+                    generate_thumbnail_for(file_path, thumb_path, height=state.settings.thumbnail_height)
                 
                 # Generate large thumbnail (256px default)
                 large_thumb_path = get_thumbnail_path_for(file_path, large=True)
                 if not large_thumb_path.exists():
-                    name_lower = file_path.name.lower()
-                    if name_lower.endswith(('.png', '.jpg', '.jpeg')):
-                        generate_thumbnail_for_image(file_path, large_thumb_path, height=state.settings.large_thumbnail_height)
-                    elif name_lower.endswith('.mp4'):
-                        generate_thumbnail_for_video(file_path, large_thumb_path, height=state.settings.large_thumbnail_height)
+                    generate_thumbnail_for(file_path, large_thumb_path, height=state.settings.large_thumbnail_height)
             except Exception as e:
                 # Log thumbnail generation errors but don't fail the commit
                 logging.warning(f"Failed to generate thumbnails for {file_path.name}: {e}")
@@ -1,20 +1,26 @@
 """Media router for handling file listing, serving, scoring, and metadata."""
 
+import asyncio
+import functools
 import json
+import os
+import stat as stat_module
 import subprocess
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from enum import Enum
 
-from fastapi import APIRouter, HTTPException, Request
+from fastapi import APIRouter, HTTPException, Request, Response
 from fastapi.responses import FileResponse
 from pydantic import BaseModel, Field
 
 from ..state import get_state
-from ..services.files import read_score, write_score, switch_directory, read_favourite, write_favourite
+from ..services.files import read_score, write_score, switch_directory, write_favourite, read_scores, write_scores, resolve_media_path, refresh_file_list, scores_version
 from ..services.thumbnails import start_thumbnail_generation
-from ..utils.png_chunks import read_png_parameters_text
+from ..utils.png_chunks import read_png_dimensions, read_png_parameters_text
+from ..utils.mp4_header import read_mp4_dimensions
+from ..utils.json_response import FastJSONResponse, json_loads, read_json
 from ..database.models import MediaFile
 
 
@@ -60,9 +66,14 @@ except ImportError:
 router = APIRouter(prefix="/api")
 
 
+# Filesystem-mode listing for the current listing version: (etag, JSON body)
+_videos_cache: Optional[tuple] = None
+
+
 @router.get("/videos")
-def list_videos():
+def list_videos(request: Request):
     """Return list of media files with scores and configuration."""
+    global _videos_cache
     state = get_state()
     
     # Use database if enabled, otherwise fallback to file system
@@ -70,10 +81,36 @@ def list_videos():
     if state.database_enabled:
         # Get all media files from database
         items = _get_files_from_database(state)
+        return _videos_payload(state, items)
+    
+    # In filesystem mode the listing only changes on a scan or a score write.
+    # This process's own changes bump the listing version; score writes by
+    # other processes (or new legacy sidecars) show up in scores_version.
+    # Both are taken before the body is built, so a write that lands
+    # meanwhile changes the key for the next request rather than being lost.
+    # (The database can be changed by other processes, so it is not cached.)
+    # Files added or removed since the scan trigger a rescan here.
+    refresh_file_list()
+    directories = {p.parent for p in state.file_list} or {state.video_dir}
+    etag = f'W/"{state.listing_epoch}-{state.listing_version}-{scores_version(directories)}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    
+    # Keep the encoded body, so repeat fetches skip serialization entirely
+    cached = _videos_cache
+    if cached is not None and cached[0] == etag:
+        body = cached[1]
     else:
         # Original file system behavior - load all files
         items = _get_files_from_filesystem(state)
-    
+        body = FastJSONResponse(_videos_payload(state, items)).body
+        _videos_cache = (etag, body)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _videos_payload(state, items):
+    """Build the /api/videos response body."""
     return {
         "dir": str(state.video_dir), 
         "pattern": state.file_pattern, 
@@ -87,7 +124,7 @@ def list_videos():
 
 
 @router.post("/filter")
-async def filter_videos(request: FilterRequest):
+def filter_videos(request: FilterRequest):
     """Filter media files based on criteria with sorting."""
     state = get_state()
     
@@ -178,32 +215,60 @@ async def filter_videos(request: FilterRequest):
         raise HTTPException(500, f"Filter failed: {str(e)}")
 
 
-def _get_files_from_filesystem(state):
-    """Get media files from file system (original behavior)."""
-    items = []
-    for p in state.file_list:
-        # Get file modification time as best approximation of creation date
-        try:
-            stat = p.stat()
-            original_created_at = datetime.fromtimestamp(stat.st_mtime).isoformat()
-        except (OSError, ValueError):
-            original_created_at = None
-            
-        items.append({
+# Per-scan part of each filesystem listing entry: (file_list, entries).
+# Everything but the score is fixed until the next scan, so a score write
+# only rejoins the in-memory scores instead of re-statting every file.
+_scan_entries_cache: Optional[tuple] = None
+
+
+def _scan_entries(file_list: List[Path]) -> List[dict]:
+    """Build (or reuse) the score-independent listing entries for a scan."""
+    global _scan_entries_cache
+    cached = _scan_entries_cache
+    if cached is not None and cached[0] is file_list:
+        return cached[1]
+    modified = _modified_iso
+    entries = []
+    for p in file_list:
+        ext = p.suffix.lower()
+        entries.append({
             "name": p.name,
             "url": f"/media/{p.name}",
-            "score": read_score(p) if read_score(p) is not None else 0,
-            "favourite": read_favourite(p),
+            "score": 0,
+            "favourite": False,
             "path": str(p),  # Full path
             "created_at": None,  # Not available from filesystem
-            "original_created_at": original_created_at,  # Use file modification time
-            "file_type": "video" if p.suffix.lower() == ".mp4" else "image",
-            "extension": p.suffix.lower(),
+            "original_created_at": modified(p),  # Use file modification time
+            "file_type": "video" if ext == ".mp4" else "image",
+            "extension": ext,
             "nsfw": False  # Not available from filesystem
         })
+    _scan_entries_cache = (file_list, entries)
+    return entries
+
+
+def _get_files_from_filesystem(state):
+    """Get media files from file system (original behavior)."""
+    file_list = state.file_list
+    entries = _scan_entries(file_list)
+    scores = read_scores(file_list)
+    items = []
+    for entry, (score, favourite) in zip(entries, scores):
+        item = dict(entry)
+        item["score"] = score or 0
+        item["favourite"] = favourite
+        items.append(item)
     return items
 
 
+def _modified_iso(p: Path) -> Optional[str]:
+    """File modification time as ISO text, the best approximation of creation date."""
+    try:
+        return datetime.fromtimestamp(os.stat(p).st_mtime).isoformat()
+    except (OSError, ValueError):
+        return None
+
+
 def _get_files_from_database(state):
     """Get media files from database."""
     items = []
@@ -240,17 +305,26 @@ def _get_files_from_database(state):
     return items
 
 
+# Scans run in a worker thread; this keeps two of them from interleaving
+# their updates to the shared state.
+_scan_lock = asyncio.Lock()
+
+
 @router.post("/scan")
 async def scan_directory(req: Request):
     """Scan a new directory for media files."""
-    data = await req.json()
-    new_dir = Path(str(data.get("dir",""))).expanduser().resolve()
+    data = await read_json(req)
+    new_dir = Path(str(data.get("dir",""))).expanduser()
     pattern = str(data.get("pattern","")).strip() or None
     
-    if not new_dir.exists() or not new_dir.is_dir():
+    # Path resolution and the scan itself hit the filesystem (slow on network
+    # shares), so keep them off the event loop
+    new_dir = await asyncio.to_thread(new_dir.resolve)
+    if not await asyncio.to_thread(new_dir.is_dir):
         raise HTTPException(400, f"Directory not found: {new_dir}")
     
-    file_list = switch_directory(new_dir, pattern)
+    async with _scan_lock:
+        file_list = await asyncio.to_thread(switch_directory, new_dir, pattern)
     
     # Start thumbnail generation if enabled
     start_thumbnail_generation(new_dir, file_list)
@@ -265,7 +339,7 @@ async def scan_directory(req: Request):
 
 
 @router.get("/meta/{name:path}")
-def get_media_metadata(name: str):
+def get_media_metadata(name: str, request: Request):
     """Get metadata for a media file."""
     state = get_state()
     
@@ -303,17 +377,17 @@ def get_media_metadata(name: str):
                     else:
                         # File not in database, fall back to filesystem lookup
                         state.logger.warning(f"File '{name}' not found in database, falling back to filesystem")
-                        target = (state.video_dir / name).resolve()
+                        target = resolve_media_path(state.video_dir, name)
             else:
                 # Database service not available, use filesystem
-                target = (state.video_dir / name).resolve()
+                target = resolve_media_path(state.video_dir, name)
         except Exception as e:
             state.logger.error(f"Database error when looking up file for metadata: {e}")
             # Fall back to filesystem lookup
-            target = (state.video_dir / name).resolve()
+            target = resolve_media_path(state.video_dir, name)
     else:
         # Original filesystem behavior
-        target = (state.video_dir / name).resolve()
+        target = resolve_media_path(state.video_dir, name)
     
     # Security check
     try:
@@ -321,9 +395,22 @@ def get_media_metadata(name: str):
     except Exception:
         raise HTTPException(403, "Forbidden path")
     
-    if not target.exists() or not target.is_file():
+    try:
+        st = os.stat(target)
+    except OSError:
+        st = None
+    if st is None or not stat_module.S_ISREG(st.st_mode):
         raise HTTPException(404, f"File not found: {target}")
 
+    # Extracted metadata only depends on the file itself, so in filesystem
+    # mode it can be revalidated by mtime and size like the media response
+    cache_headers = None
+    if not state.database_enabled:
+        etag = f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+        cache_headers = {"ETag": etag, "Cache-Control": "private, max-age=300"}
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers=cache_headers)
+
     # First check if we have metadata in database
     metadata = {}
     if state.database_enabled and media_file:
@@ -345,7 +432,7 @@ def get_media_metadata(name: str):
                     # Add PNG text if available
                     if db_metadata.png_text:
                         try:
-                            metadata["png_text"] = json.loads(db_metadata.png_text)
+                            metadata["png_text"] = json_loads(db_metadata.png_text)
                         except json.JSONDecodeError:
                             pass
                     
@@ -360,39 +447,10 @@ def get_media_metadata(name: str):
             state.logger.error(f"Failed to get metadata from database: {e}")
 
     # Fallback to on-demand extraction (original behavior)
-    ext = target.suffix.lower()
-    if ext == ".mp4":
-        # Use ffprobe to retrieve width/height
-        try:
-            cmd = [
-                "ffprobe", "-v", "error",
-                "-select_streams", "video:0",
-                "-show_entries", "stream=width,height",
-                "-of", "json", str(target)
-            ]
-            cp = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            info = json.loads(cp.stdout or "{}")
-            if isinstance(info, dict) and info.get("streams"):
-                st = info["streams"][0]
-                w = st.get("width")
-                h = st.get("height")
-                if w and h:
-                    metadata = {"width": int(w), "height": int(h)}
-        except Exception as e:
-            return {"error": str(e)}
-    elif ext in {".png", ".jpg", ".jpeg"}:
-        try:
-            if Image is None:
-                metadata = {"error": "Pillow not installed"}
-            else:
-                with Image.open(target) as im:
-                    metadata = {"width": int(im.width), "height": int(im.height)}
-            if ext == ".png":
-                txt = read_png_parameters_text(target)
-                if txt:
-                    metadata["png_text"] = txt
-        except Exception as e:
-            return {"error": str(e)}
+    try:
+        metadata = dict(_extract_file_metadata(str(target), st.st_mtime_ns, st.st_size))
+    except Exception as e:
+        return {"error": str(e)}
     
     # Store extracted metadata in database for future use
     if metadata and state.database_enabled:
@@ -402,6 +460,55 @@ def get_media_metadata(name: str):
         except Exception as e:
             state.logger.error(f"Failed to store metadata in database: {e}")
     
+    if cache_headers is not None:
+        return FastJSONResponse(metadata, headers=cache_headers)
+    return metadata
+
+
+@functools.lru_cache(maxsize=2048)
+def _extract_file_metadata(path: str, mtime_ns: int, size: int) -> dict:
+    """Read width/height (and PNG text) from a media file.
+    
+    Keyed by mtime and size so a changed file is re-read; navigating back
+    and forth in the UI no longer re-runs ffprobe or re-parses images.
+    Failures raise and are therefore not cached.
+    """
+    target = Path(path)
+    metadata = {}
+    ext = target.suffix.lower()
+    if ext == ".mp4":
+        # Read width/height from the MP4 headers; ffprobe only if that fails
+        dims = read_mp4_dimensions(target)
+        if dims is not None:
+            return {"width": dims[0], "height": dims[1]}
+        cmd = [
+            "ffprobe", "-v", "error",
+            "-select_streams", "video:0",
+            "-show_entries", "stream=width,height",
+            "-of", "json", str(target)
+        ]
+        cp = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        info = json_loads(cp.stdout or "{}")
+        if isinstance(info, dict) and info.get("streams"):
+            st = info["streams"][0]
+            w = st.get("width")
+            h = st.get("height")
+            if w and h:
+                metadata = {"width": int(w), "height": int(h)}
+    elif ext in {".png", ".jpg", ".jpeg"}:
+        # A real PNG gets its size from IHDR without opening it in Pillow;
+        # JPEGs and mislabelled .png files go through Pillow
+        dims = read_png_dimensions(target) if ext == ".png" else None
+        if dims is not None:
+            metadata = {"width": dims[0], "height": dims[1]}
+            txt = read_png_parameters_text(target)
+            if txt:
+                metadata["png_text"] = txt
+        elif Image is None:
+            metadata = {"error": "Pillow not installed"}
+        else:
+            with Image.open(target) as im:
+                metadata = {"width": int(im.width), "height": int(im.height)}
     return metadata
 
 
@@ -444,17 +551,17 @@ def get_media_info(name: str):
                     else:
                         # File not in database, fall back to filesystem lookup
                         state.logger.warning(f"File '{name}' not found in database, falling back to filesystem")
-                        target = (state.video_dir / name).resolve()
+                        target = resolve_media_path(state.video_dir, name)
             else:
                 # Database service not available, use filesystem
-                target = (state.video_dir / name).resolve()
+                target = resolve_media_path(state.video_dir, name)
         except Exception as e:
             state.logger.error(f"Database error when looking up file for info: {e}")
             # Fall back to filesystem lookup
-            target = (state.video_dir / name).resolve()
+            target = resolve_media_path(state.video_dir, name)
     else:
         # Original filesystem behavior
-        target = (state.video_dir / name).resolve()
+        target = resolve_media_path(state.video_dir, name)
     
     # Security check
     try:
@@ -462,7 +569,7 @@ def get_media_info(name: str):
     except Exception:
         raise HTTPException(403, "Forbidden path")
     
-    if not target.exists() or not target.is_file():
+    if not target.is_file():
         raise HTTPException(404, f"File not found: {target}")
     
     # Get file stats
@@ -515,7 +622,7 @@ def get_media_info(name: str):
                     # Add metadata fields
                     if db_metadata.png_text:
                         try:
-                            info["metadata"]["png_text"] = json.loads(db_metadata.png_text)
+                            info["metadata"]["png_text"] = json_loads(db_metadata.png_text)
                         except json.JSONDecodeError:
                             info["metadata"]["png_text"] = db_metadata.png_text
                     
@@ -543,7 +650,7 @@ def get_media_info(name: str):
                 "-of", "json", str(target)
             ]
             cp = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            ffprobe_info = json.loads(cp.stdout or "{}")
+            ffprobe_info = json_loads(cp.stdout or "{}")
             
             if isinstance(ffprobe_info, dict) and ffprobe_info.get("streams"):
                 stream = ffprobe_info["streams"][0]
@@ -611,14 +718,13 @@ def get_media_info(name: str):
     return info
 
 
-@router.post("/score")
-async def update_score(req: Request):
-    """Update score for a media file."""
-    state = get_state()
-    data = await req.json()
-    name = data.get("name")
-    score = int(data.get("score", 0))
+def _find_score_target(state, name: str):
+    """Find the file a score write is for.
     
+    Returns (target, score_path): the path on this filesystem, and the path
+    to record the score under (the original database path in database mode,
+    to avoid duplicate records). Raises HTTPException if it can't be found.
+    """
     # Initialize variables for database mode
     media_file = None
     db_path = None
@@ -660,27 +766,39 @@ async def update_score(req: Request):
             raise HTTPException(500, f"Database error: {str(e)}")
     else:
         # Original filesystem behavior
-        target = state.video_dir / name
-        if not target.exists() or target not in state.file_list:
+        target = state.file_index.get(name)
+        if target is None:
             raise HTTPException(404, "File not found")
     
     if not target.exists():
         state.logger.error(f"File not found on filesystem: {target}")
         raise HTTPException(404, f"File not found on filesystem: {target}")
     
+    # For database mode, we need to pass the original database path to write_score
+    # so the database update uses the correct path for lookup
+    if state.database_enabled and media_file:
+        # Use the original database path for write_score to avoid duplicates
+        return target, Path(db_path)
+    # Use the translated/filesystem path for non-database mode
+    return target, target
+
+
+@router.post("/score")
+async def update_score(req: Request):
+    """Update score for a media file."""
+    state = get_state()
+    data = await read_json(req)
+    name = data.get("name")
+    score = int(data.get("score", 0))
+    
+    # The database lookup and the existence check block; run them in a thread
+    target, score_path = await asyncio.to_thread(_find_score_target, state, name)
+
     state.logger.info(f"Updating score: file={name} score={score} path={target}")
     
     try:
-        # For database mode, we need to pass the original database path to write_score
-        # so the database update uses the correct path for lookup
-        if state.database_enabled and media_file:
-            # Use the original database path for write_score to avoid duplicates
-            score_path = Path(db_path)
-        else:
-            # Use the translated/filesystem path for non-database mode
-            score_path = target
-            
-        write_score(score_path, score)
+        # Score index and database writes block; keep them off the event loop
+        await asyncio.to_thread(write_score, score_path, score)
         state.logger.info(f"SCORE UPDATE SUCCESS: file={name} score={score} path={target} db_path={score_path}")
         return {"ok": True}
     except Exception as e:
@@ -688,11 +806,65 @@ async def update_score(req: Request):
         raise HTTPException(500, f"Failed to update score: {str(e)}")
 
 
+@router.post("/scores")
+async def update_scores(req: Request):
+    """Update scores for several media files in one request.
+    
+    JSON body: { "scores": [{"name": "file1.mp4", "score": 3}, ...] }
+    Files that can't be found are reported per item; the rest are written
+    together.
+    """
+    state = get_state()
+    data = await read_json(req)
+    entries = data.get("scores")
+    if not isinstance(entries, list):
+        raise HTTPException(400, "scores must be a list of {name, score}")
+    
+    # Every entry's lookup blocks; resolve the whole batch in one thread
+    results, writes = await asyncio.to_thread(_find_score_targets, state, entries)
+    
+    if writes:
+        try:
+            await asyncio.to_thread(write_scores, writes)
+        except Exception as e:
+            state.logger.error(f"SCORE UPDATE FAILED: files={len(writes)} error={e}")
+            raise HTTPException(500, f"Failed to update scores: {str(e)}")
+        state.logger.info("SCORE UPDATE SUCCESS: " + " | ".join(
+            f"file={p.name} score={sc}" for p, sc in writes
+        ))
+    
+    return {"ok": all(r["ok"] for r in results), "results": results}
+
+
+def _find_score_targets(state, entries: list) -> Tuple[List[dict], List[Tuple[Path, int]]]:
+    """Resolve a batch of score updates.
+    
+    Returns the per-entry results and the (score_path, score) writes for the
+    entries that could be found.
+    """
+    results = []
+    writes = []
+    for entry in entries:
+        name = entry.get("name") if isinstance(entry, dict) else None
+        try:
+            score = int(entry.get("score", 0))
+            target, score_path = _find_score_target(state, name)
+        except HTTPException as e:
+            results.append({"name": name, "ok": False, "error": e.detail})
+            continue
+        except (AttributeError, TypeError, ValueError):
+            results.append({"name": name, "ok": False, "error": "invalid entry"})
+            continue
+        writes.append((score_path, score))
+        results.append({"name": name, "ok": True})
+    return results, writes
+
+
 @router.post("/nsfw")
 async def update_nsfw(req: Request):
     """Update NSFW status for a media file."""
     state = get_state()
-    data = await req.json()
+    data = await read_json(req)
     name = data.get("name")
     nsfw = bool(data.get("nsfw", False))
     
@@ -700,27 +872,10 @@ async def update_nsfw(req: Request):
         raise HTTPException(503, "Database functionality is required for NSFW updates")
     
     try:
-        db_service = state.get_database_service()
-        if db_service is None:
-            raise HTTPException(503, "Database service not available")
-            
-        with db_service as db:
-            # Find the media file by filename
-            media_file = db.session.query(MediaFile).filter(
-                MediaFile.filename == name
-            ).first()
-            
-            if not media_file:
-                raise HTTPException(404, f"File '{name}' not found in database")
-            
-            # Update NSFW status
-            media_file.nsfw = nsfw
-            media_file.nsfw_label = nsfw
-            db.session.commit()
-            
-            state.logger.info(f"NSFW UPDATE SUCCESS: file={name} nsfw={nsfw}")
-            return {"ok": True, "nsfw": nsfw}
-            
+        # The lookup and commit block on the database; keep them off the event loop
+        await asyncio.to_thread(_write_nsfw, state, name, nsfw)
+        state.logger.info(f"NSFW UPDATE SUCCESS: file={name} nsfw={nsfw}")
+        return {"ok": True, "nsfw": nsfw}
     except HTTPException:
         raise
     except Exception as e:
@@ -728,18 +883,55 @@ async def update_nsfw(req: Request):
         raise HTTPException(500, f"Failed to update NSFW status: {str(e)}")
 
 
+def _write_nsfw(state, name: str, nsfw: bool) -> None:
+    db_service = state.get_database_service()
+    if db_service is None:
+        raise HTTPException(503, "Database service not available")
+        
+    with db_service as db:
+        # Find the media file by filename
+        media_file = db.session.query(MediaFile).filter(
+            MediaFile.filename == name
+        ).first()
+        
+        if not media_file:
+            raise HTTPException(404, f"File '{name}' not found in database")
+        
+        # Update NSFW status
+        media_file.nsfw = nsfw
+        media_file.nsfw_label = nsfw
+        db.session.commit()
+
+
 @router.post("/favourite")
 async def update_favourite(req: Request):
     """Update favourite status for a media file."""
     state = get_state()
-    data = await req.json()
+    data = await read_json(req)
     name = data.get("name")
     favourite = bool(data.get("favourite", False))
     
-    # Initialize variables for database mode
-    media_file = None
-    db_path = None
+    # The database lookup and the existence check block; run them in a thread
+    target, favourite_path = await asyncio.to_thread(_find_favourite_target, state, name)
     
+    state.logger.info(f"Updating favourite: file={name} favourite={favourite} path={target}")
+    
+    try:
+        # Score index and database writes block; keep them off the event loop
+        await asyncio.to_thread(write_favourite, favourite_path, favourite)
+        state.logger.info(f"FAVOURITE UPDATE SUCCESS: file={name} favourite={favourite} path={target}")
+        return {"ok": True, "favourite": favourite}
+    except Exception as e:
+        state.logger.error(f"FAVOURITE UPDATE FAILED: file={name} favourite={favourite} error={e}")
+        raise HTTPException(500, f"Failed to update favourite: {str(e)}")
+
+
+def _find_favourite_target(state, name: str) -> Tuple[Path, Path]:
+    """Resolve a favourite update to (file on disk, path to record it under).
+    
+    In database mode the record is keyed by the original database path, so
+    write_favourite gets that rather than the translated container path.
+    """
     # If database is enabled, find the file by its filename in the database
     if state.database_enabled:
         try:
@@ -775,49 +967,40 @@ async def update_favourite(req: Request):
         except Exception as e:
             state.logger.error(f"Database error when looking up file for favourite: {e}")
             raise HTTPException(500, f"Database error: {str(e)}")
+        favourite_path = Path(db_path)
     else:
         # Original filesystem behavior
-        target = state.video_dir / name
-        if not target.exists() or target not in state.file_list:
+        target = state.file_index.get(name)
+        if target is None:
             raise HTTPException(404, "File not found")
+        favourite_path = target
     
     if not target.exists():
         state.logger.error(f"File not found on filesystem: {target}")
         raise HTTPException(404, f"File not found on filesystem: {target}")
     
-    state.logger.info(f"Updating favourite: file={name} favourite={favourite} path={target}")
-    
-    try:
-        # For database mode, we need to pass the original database path to write_favourite
-        # so the database update uses the correct path for lookup
-        if state.database_enabled and media_file:
-            # Use the original database path for write_favourite to avoid duplicates
-            favourite_path = Path(db_path)
-        else:
-            # Use the translated/filesystem path for non-database mode
-            favourite_path = target
-            
-        write_favourite(favourite_path, favourite)
-        state.logger.info(f"FAVOURITE UPDATE SUCCESS: file={name} favourite={favourite} path={target}")
-        return {"ok": True, "favourite": favourite}
-    except Exception as e:
-        state.logger.error(f"FAVOURITE UPDATE FAILED: file={name} favourite={favourite} error={e}")
-        raise HTTPException(500, f"Failed to update favourite: {str(e)}")
+    return target, favourite_path
 
 
-@router.post("/key")
+@router.post("/key", status_code=204)
 async def log_key_press(req: Request):
-    """Log key press for analytics."""
+    """Log key press for analytics; nothing is sent back to the client."""
     state = get_state()
-    data = await req.json()
-    key = str(data.get("key"))
-    fname = str(data.get("name"))
-    state.logger.info(f"KEY key={key} file={fname}")
-    return {"ok": True}
+    data = await read_json(req)
+    # Clients batch key presses as {"keys": [{"key", "name"}, ...]}; a single
+    # {"key", "name"} body is still accepted.
+    events = data.get("keys") if isinstance(data.get("keys"), list) else [data]
+    entries = [
+        f"key={ev.get('key')} file={ev.get('name')}"
+        for ev in events if isinstance(ev, dict)
+    ]
+    if entries:
+        state.logger.info("KEY " + " | ".join(entries))
+    return Response(status_code=204)
 
 
 @router.get("/directories")
-async def list_directories(path: str = ""):
+def list_directories(path: str = ""):
     """List directories in the given path, excluding dot folders."""
     state = get_state()
     
@@ -828,19 +1011,10 @@ async def list_directories(path: str = ""):
             target_path = Path(path).expanduser().resolve()
         
         # Security check: ensure we're not accessing forbidden paths
-        if not target_path.exists() or not target_path.is_dir():
+        if not target_path.is_dir():
             raise HTTPException(404, "Directory not found")
         
-        directories = []
-        for item in target_path.iterdir():
-            if item.is_dir() and not item.name.startswith('.'):
-                directories.append({
-                    "name": item.name,
-                    "path": str(item)
-                })
-        
-        # Sort directories alphabetically
-        directories.sort(key=lambda x: x["name"].lower(), reverse=state.settings.directory_sort_desc)
+        directories = _list_subdirectories(target_path, state.settings.directory_sort_desc)
         
         return {"directories": directories, "current_path": str(target_path)}
     except Exception as e:
@@ -848,7 +1022,7 @@ async def list_directories(path: str = ""):
 
 
 @router.get("/sibling-directories")
-async def list_sibling_directories(path: str = ""):
+def list_sibling_directories(path: str = ""):
     """List sibling directories (directories at the same level), excluding dot folders."""
     state = get_state()
     
@@ -859,32 +1033,46 @@ async def list_sibling_directories(path: str = ""):
             target_path = Path(path).expanduser().resolve()
         
         # Security check: ensure we're not accessing forbidden paths
-        if not target_path.exists() or not target_path.is_dir():
+        if not target_path.is_dir():
             raise HTTPException(404, "Directory not found")
         
         # Get parent directory
         parent_path = target_path.parent
-        if not parent_path.exists() or not parent_path.is_dir():
+        if not parent_path.is_dir():
             return {"directories": [], "current_path": str(target_path), "parent_path": str(parent_path)}
         
-        directories = []
-        for item in parent_path.iterdir():
-            if item.is_dir() and not item.name.startswith('.') and item != target_path:
-                directories.append({
-                    "name": item.name,
-                    "path": str(item)
-                })
-        
-        # Sort directories alphabetically
-        directories.sort(key=lambda x: x["name"].lower(), reverse=state.settings.directory_sort_desc)
+        directories = [
+            d for d in _list_subdirectories(parent_path, state.settings.directory_sort_desc)
+            if d["name"] != target_path.name
+        ]
         
         return {"directories": directories, "current_path": str(target_path), "parent_path": str(parent_path)}
     except Exception as e:
         raise HTTPException(500, f"Failed to list sibling directories: {str(e)}")
 
 
+def _list_subdirectories(parent: Path, descending: bool) -> List[dict]:
+    """Non-dot subdirectories of a directory, sorted by name.
+    
+    Uses one scandir: entry types come from the directory listing, so only
+    symlinks need a stat to see whether they point at a directory.
+    """
+    directories = []
+    with os.scandir(parent) as it:
+        for entry in it:
+            if not entry.name.startswith('.') and entry.is_dir():
+                directories.append({
+                    "name": entry.name,
+                    "path": os.path.join(parent, entry.name)
+                })
+    
+    # Sort directories alphabetically
+    directories.sort(key=lambda x: x["name"].lower(), reverse=descending)
+    return directories
+
+
 @router.get("/media/daily-counts")
-async def get_daily_media_counts(rebuild: bool = False):
+def get_daily_media_counts(rebuild: bool = False):
     """Get media file counts grouped by creation date for contribution graph.
     
     Args:
@@ -1,15 +1,20 @@
 """Root-level routes for media serving, downloads, and thumbnails."""
 
+import hashlib
+import os
+import stat
+from email.utils import formatdate, parsedate_to_datetime
 from pathlib import Path
+from urllib.parse import quote
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
 from fastapi.responses import FileResponse, HTMLResponse
 
 from ..state import get_state
+from ..services.files import resolve_media_path
 from ..services.thumbnails import (
     get_thumbnail_path_for, 
-    generate_thumbnail_for_image, 
-    generate_thumbnail_for_video
+    generate_thumbnail_for
 )
 
 try:
@@ -20,6 +25,117 @@ except ImportError:
 
 router = APIRouter()
 
+_MEDIA_TYPES = {
+    ".mp4": "video/mp4",
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+}
+
+
+def _media_type_for(name: str) -> str:
+    """Map a file name to the Content-Type it is served with."""
+    return _MEDIA_TYPES.get(os.path.splitext(name)[1].lower(), "application/octet-stream")
+
+
+def _stat_indexed_file(name: str):
+    """Look up a discovered file by name and stat it once.
+    
+    Returns (path, stat_result), or None if the name was not discovered by
+    the last scan, the file has since disappeared, or it is not a regular
+    file. Only files directly inside the media directory qualify: the
+    index is keyed by bare name, and a file in a subdirectory (found by a
+    recursive pattern) may sit under a symlinked directory. Those, and
+    symlinks, are left to the caller's resolve() + containment check,
+    since they may point outside the media directory. Handing the stat to
+    FileResponse saves it from stat-ing the file again.
+    """
+    state = get_state()
+    target = state.file_index.get(name)
+    if target is None or target.parent != state.video_dir:
+        return None
+    try:
+        st = os.lstat(target)
+    except OSError:
+        return None
+    if not stat.S_ISREG(st.st_mode):
+        return None
+    return target, st
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison)."""
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def _conditional_file_response(request: Request, target: Path, st: os.stat_result, media_type: str) -> Response:
+    """Serve a file, or 304 Not Modified if the client's cached copy is current.
+    
+    The ETag is derived from mtime and size, so a replaced file gets a new
+    tag. If-None-Match takes precedence over If-Modified-Since (RFC 9110).
+    """
+    etag = f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(st.st_mtime, usegmt=True),
+        "Cache-Control": "public, max-age=3600",
+    }
+    
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+    else:
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                since = parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                since = None
+            if since is not None and int(st.st_mtime) <= since:
+                return Response(status_code=304, headers=headers)
+    
+    return _file_response(target, st, media_type, headers)
+
+
+def _file_response(target: Path, st: os.stat_result, media_type: str, headers: dict = None, filename: str = None) -> Response:
+    """Send a file, or hand it to the front proxy when sendfile_header is set.
+    
+    With X-Accel-Redirect (nginx) or X-Sendfile (Apache) the response has no
+    body; the proxy sends the file itself with sendfile(2) and handles Range
+    requests, so a long video stream doesn't hold a worker thread. Only
+    files that passed the usual lookups and containment checks get here.
+    """
+    settings = get_state().settings
+    if settings.sendfile_header == "X-Sendfile":
+        # mod_xsendfile takes the raw filesystem path, not a URL, so send the
+        # path's own bytes: Starlette encodes header values as Latin-1, which
+        # maps each of these characters back to one byte. A path with control
+        # characters can't go in a header at all and is sent by us instead.
+        sendfile_path = os.fsencode(target).decode("latin-1")
+        if any(ord(c) < 0x20 or c == "\x7f" for c in sendfile_path):
+            return FileResponse(target, media_type=media_type, headers=headers, filename=filename, stat_result=st)
+    if settings.sendfile_header is None:
+        return FileResponse(target, media_type=media_type, headers=headers, filename=filename, stat_result=st)
+    
+    headers = dict(headers or {})
+    if filename is not None:
+        # Same form as FileResponse's Content-Disposition
+        quoted = quote(filename)
+        if quoted != filename:
+            headers["Content-Disposition"] = f"attachment; filename*=utf-8''{quoted}"
+        else:
+            headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    if settings.sendfile_header == "X-Accel-Redirect":
+        headers["X-Accel-Redirect"] = settings.accel_redirect_prefix.rstrip("/") + quote(str(target))
+    else:
+        headers["X-Sendfile"] = sendfile_path
+    return Response(media_type=media_type, headers=headers)
+
 
 @router.get("/maximize/{name:path}")
 def maximize_media(name: str):
@@ -56,7 +172,7 @@ def maximize_media(name: str):
     
     # Fallback to original behavior if database lookup failed or not enabled
     if not target:
-        target = (state.video_dir / name).resolve()
+        target = resolve_media_path(state.video_dir, name)
         
         # Security: ensure the resolved path is within video directory
         try:
@@ -64,7 +180,7 @@ def maximize_media(name: str):
         except Exception:
             raise HTTPException(403, "Forbidden path")
     
-    if not target.exists() or not target.is_file():
+    if not target.is_file():
         raise HTTPException(404, "File not found")
     
     # Determine if it's a video or image
@@ -136,7 +252,7 @@ def maximize_media(name: str):
 
 
 @router.get("/media/{name:path}")
-def serve_media(name: str):
+def serve_media(name: str, request: Request):
     """Serve media files."""
     state = get_state()
     
@@ -165,23 +281,20 @@ def serve_media(name: str):
                     else:
                         target = Path(db_path).resolve()
                     
-                    if target.exists() and target.is_file():
-                        ext = target.suffix.lower()
-                        if ext == ".mp4":
-                            mime = "video/mp4"
-                        elif ext == ".png":
-                            mime = "image/png"
-                        elif ext in {".jpg", ".jpeg"}:
-                            mime = "image/jpeg"
-                        else:
-                            mime = "application/octet-stream"
-                        
-                        return FileResponse(target, media_type=mime)
+                    if target.is_file():
+                        return _conditional_file_response(request, target, target.stat(), _media_type_for(target.name))
         except Exception as e:
             state.logger.error(f"Database media serving failed: {e}")
     
+    # Fast path: a file found by the last scan, served with a single stat.
+    # Video seeking issues many Range requests, so this path is hot.
+    indexed = _stat_indexed_file(name)
+    if indexed is not None:
+        target, st = indexed
+        return _conditional_file_response(request, target, st, _media_type_for(name))
+    
     # Fallback to original behavior - serve from current video directory
-    target = (state.video_dir / name).resolve()
+    target = resolve_media_path(state.video_dir, name)
     
     # Security: ensure the resolved path is within video directory
     try:
@@ -189,20 +302,10 @@ def serve_media(name: str):
     except Exception:
         raise HTTPException(403, "Forbidden path")
     
-    if not target.exists() or not target.is_file():
+    if not target.is_file():
         raise HTTPException(404, "File not found")
     
-    ext = target.suffix.lower()
-    if ext == ".mp4":
-        mime = "video/mp4"
-    elif ext == ".png":
-        mime = "image/png"
-    elif ext in {".jpg", ".jpeg"}:
-        mime = "image/jpeg"
-    else:
-        mime = "application/octet-stream"
-    
-    return FileResponse(target, media_type=mime)
+    return _conditional_file_response(request, target, target.stat(), _media_type_for(target.name))
 
 
 @router.get("/download/{name:path}")
@@ -238,24 +341,37 @@ def download_media(name: str):
         except Exception as e:
             state.logger.error(f"Database lookup failed for download: {e}")
     
+    # Fast path: a file found by the last scan, served with a single stat
+    if not target:
+        indexed = _stat_indexed_file(name)
+        if indexed is not None:
+            target, st = indexed
+            return _file_response(target, st, "application/octet-stream", filename=name)
+    
     # Fallback to original behavior if database lookup failed or not enabled
     if not target:
-        target = (state.video_dir / name).resolve()
+        target = resolve_media_path(state.video_dir, name)
         
         try:
             target.relative_to(state.video_dir)
         except Exception:
             raise HTTPException(403, "Forbidden path")
     
-    if not target.exists() or not target.is_file():
+    # One stat both checks the file and gives FileResponse its
+    # Content-Length, so it doesn't stat the file again
+    try:
+        st = os.stat(target)
+    except OSError:
+        st = None
+    if st is None or not stat.S_ISREG(st.st_mode):
         raise HTTPException(404, "File not found")
     
     # Force download via Content-Disposition
-    return FileResponse(target, media_type="application/octet-stream", filename=name)
+    return _file_response(target, st, "application/octet-stream", filename=name)
 
 
 @router.get("/thumbnail/{name:path}")
-def serve_thumbnail(name: str, size: str = "regular"):
+def serve_thumbnail(name: str, request: Request, size: str = "regular"):
     """Serve thumbnail image for a media file.
     
     Args:
@@ -294,8 +410,12 @@ def serve_thumbnail(name: str, size: str = "regular"):
                         thumbnail = db.get_thumbnail(Path(media_file.file_path), thumbnail_size)
                         if thumbnail and thumbnail.thumbnail_data:
                             # Return thumbnail from database
+                            etag = f'"{hashlib.md5(thumbnail.thumbnail_data.encode("ascii")).hexdigest()}"'
+                            headers = {"ETag": etag, "Cache-Control": "public, max-age=3600"}
+                            if _etag_matches(request.headers.get("if-none-match", ""), etag):
+                                return Response(status_code=304, headers=headers)
                             thumbnail_bytes = base64.b64decode(thumbnail.thumbnail_data)
-                            return Response(content=thumbnail_bytes, media_type=thumbnail.mime_type)
+                            return Response(content=thumbnail_bytes, media_type=thumbnail.mime_type, headers=headers)
                         
                         # Store paths for filesystem fallback
                         db_path = media_file.file_path
@@ -314,28 +434,29 @@ def serve_thumbnail(name: str, size: str = "regular"):
     
     # Fallback to filesystem behavior if database not enabled or no thumbnail found
     if not media_file:
-        target = (state.video_dir / name).resolve()
+        target = resolve_media_path(state.video_dir, name)
         try:
             target.relative_to(state.video_dir)
         except Exception:
             raise HTTPException(403, "Forbidden path")
     
-    if not target.exists() or not target.is_file():
+    if not target.is_file():
         raise HTTPException(404, "Media file not found")
     
     # Get filesystem thumbnail path (regular or large)
     thumb_path = get_thumbnail_path_for(target, large=use_large)
     
-    if not thumb_path.exists():
+    # One stat both checks for the thumbnail and gives the ETag, so repeat
+    # views are answered with 304 instead of resending the image
+    try:
+        st = os.stat(thumb_path)
+    except OSError:
         # Try to generate thumbnail on demand
         height = state.settings.large_thumbnail_height if use_large else state.settings.thumbnail_height
-        name_lower = target.name.lower()
-        if name_lower.endswith(('.png', '.jpg', '.jpeg')):
-            generate_thumbnail_for_image(target, thumb_path, height=height)
-        elif name_lower.endswith('.mp4'):
-            generate_thumbnail_for_video(target, thumb_path, height=height)
-    
-    if not thumb_path.exists():
-        raise HTTPException(404, "Thumbnail not available")
+        generate_thumbnail_for(target, thumb_path, height=height)
+        try:
+            st = os.stat(thumb_path)
+        except OSError:
+            raise HTTPException(404, "Thumbnail not available")
     
-    return FileResponse(thumb_path, media_type="image/jpeg")
\ No newline at end of file
+    return _conditional_file_response(request, thumb_path, st, "image/jpeg")
@@ -11,6 +11,7 @@ from pydantic import BaseModel
 from ..state import get_state
 from ..database.service import DatabaseService
 from ..database.buffer_service import BufferService, FilterCriteria
+from ..utils.json_response import read_json
 
 router = APIRouter(prefix="/api/search")
 
@@ -123,6 +124,19 @@ async def search_files(request: SearchRequest):
         raise HTTPException(500, f"Search failed: {str(e)}")
 
 
+def _find_current_file(state, filename: str) -> Optional[Path]:
+    """Find a file in the current directory by name.
+    
+    Files found by the last scan are a dict lookup; other names fall back
+    to checking the filesystem.
+    """
+    file_path = state.file_index.get(filename)
+    if file_path is not None:
+        return file_path
+    file_path = state.video_dir / filename
+    return file_path if file_path.exists() else None
+
+
 @router.post("/keywords")
 async def add_keywords(request: AddKeywordsRequest):
     """Add keywords to a media file."""
@@ -132,8 +146,8 @@ async def add_keywords(request: AddKeywordsRequest):
         raise HTTPException(503, "Database functionality is disabled")
     
     # Find the file in current directory
-    file_path = state.video_dir / request.filename
-    if not file_path.exists():
+    file_path = _find_current_file(state, request.filename)
+    if file_path is None:
         raise HTTPException(404, f"File not found: {request.filename}")
     
     try:
@@ -191,8 +205,8 @@ async def get_file_keywords(filename: str):
     if not state.database_enabled:
         raise HTTPException(503, "Database functionality is disabled")
     
-    file_path = state.video_dir / filename
-    if not file_path.exists():
+    file_path = _find_current_file(state, filename)
+    if file_path is None:
         raise HTTPException(404, f"File not found: {filename}")
     
     try:
@@ -249,15 +263,16 @@ async def sync_directory_to_database():
         raise HTTPException(503, "Database functionality is disabled")
     
     try:
+        from ..services.files import read_scores
+        
         synced_count = 0
+        scores = read_scores(state.file_list)
         with state.get_database_service() as db:
-            for file_path in state.file_list:
+            for file_path, (sidecar_score, _) in zip(state.file_list, scores):
                 # Create/update media file record
                 media_file = db.get_or_create_media_file(file_path)
                 
-                # Read score from sidecar file if exists
-                from ..services.files import read_score
-                sidecar_score = read_score(file_path)
+                # Use the score from the score index if one exists
                 if sidecar_score is not None and media_file.score != sidecar_score:
                     media_file.score = sidecar_score
                 
@@ -488,7 +503,7 @@ async def save_view_state(request: Request):
     state = get_state()
     
     try:
-        view_state = await request.json()
+        view_state = await read_json(request)
         
         buffer_service = get_buffer_service()
         buffer_service.save_ui_state("view_state", view_state)
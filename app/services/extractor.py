@@ -1,36 +1,118 @@
 """Workflow extraction service using extract_comfyui_workflow.py."""
 
-import subprocess
+import asyncio
+import contextlib
+import functools
+import importlib.util
+import io
 import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Optional, Tuple
 
 from ..state import get_state
+from ..utils.process_pool import new_process_pool
 
 
+@functools.lru_cache(maxsize=1)
 def get_extractor_script_path() -> Path:
-    """Get path to the external extractor script."""
-    # Look for script in project root (parent of app directory)
+    """Get path to the external extractor script (resolved once)."""
+    # A copy in the project root wins, as it always has; the script that
+    # ships with the app lives in tools/
     project_root = Path(__file__).resolve().parent.parent.parent
-    return project_root / "extract_comfyui_workflow.py"
+    script = project_root / "extract_comfyui_workflow.py"
+    if script.exists():
+        return script
+    return project_root / "tools" / "extract_comfyui_workflow.py"
+
+
+# Long-lived worker processes that import the extractor once, instead of
+# paying interpreter startup and imports for every file.
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+# Per worker process: the loaded extractor module, keyed by script path
+_worker_modules: Dict[str, object] = {}
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """Get the shared extractor process pool, starting it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = new_process_pool()
+    return _pool
+
+
+def _discard_pool(broken: ProcessPoolExecutor) -> None:
+    """Drop a pool that lost a worker, so the next extraction starts a new one.
+    
+    A ProcessPoolExecutor whose worker dies stays broken for good; without
+    this every later extraction would fail until the server restarts.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is broken:
+            _pool = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def _run_extractor(script: str, video: str, out: str) -> Tuple[int, str]:
+    """Run the extractor's CLI entry point inside a pool worker.
+    
+    Behaves like ``python <script> <video> -o <out>``: returns the exit code
+    and whatever the script wrote to stderr.
+    """
+    module = _worker_modules.get(script)
+    if module is None:
+        spec = importlib.util.spec_from_file_location("_comfyui_workflow_extractor", script)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _worker_modules[script] = module
+    
+    stderr = io.StringIO()
+    saved_argv = sys.argv
+    sys.argv = [script, video, "-o", out]
+    try:
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(stderr):
+            module.main()
+        rc = 0
+    except SystemExit as e:
+        rc = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except Exception as e:
+        stderr.write(f"{type(e).__name__}: {e}\n")
+        rc = 1
+    finally:
+        sys.argv = saved_argv
+    return rc, stderr.getvalue()
 
 
 def ensure_workflows_dir(for_video: Path) -> Path:
     """Ensure workflows directory exists for video file."""
-    wf_dir = for_video.parent / ".workflows"
+    return _ensure_workflows_dir_cached(for_video.parent)
+
+
+@functools.lru_cache(maxsize=64)
+def _ensure_workflows_dir_cached(parent: Path) -> Path:
+    # Only the first file of a batch pays for the mkdir; the extractor
+    # recreates the directory itself if it is removed afterwards.
+    wf_dir = parent / ".workflows"
     wf_dir.mkdir(parents=True, exist_ok=True)
     return wf_dir
 
 
-def extract_workflow_for(video_path: Path) -> Dict[str, str]:
-    """
-    Run the external extractor for a single mp4 and write:
-    ./.workflows/<filename_without_ext>_workflow.json
-    Returns a dict with status and paths.
-    """
-    state = get_state()
+def _plan_extraction(video_path: Path):
+    """Check a video before extraction.
     
-    if not video_path.exists():
+    Returns (script, out_path) if the extractor needs to run, otherwise the
+    final result dict (missing file or extractor, or an up-to-date output).
+    """
+    try:
+        video_mtime_ns = video_path.stat().st_mtime_ns
+    except OSError:
         return {"name": video_path.name, "status": "error", "error": "file_not_found"}
     
     script = get_extractor_script_path()
@@ -38,15 +120,53 @@ def extract_workflow_for(video_path: Path) -> Dict[str, str]:
         return {"name": video_path.name, "status": "error", "error": "missing_extractor"}
     
     out_path = ensure_workflows_dir(video_path) / f"{video_path.stem}_workflow.json"
-    cmd = [sys.executable, str(script), str(video_path), "-o", str(out_path)]
     
+    # An output at least as new as the video is still current; skip the work
+    try:
+        if out_path.stat().st_mtime_ns >= video_mtime_ns:
+            return {"name": video_path.name, "status": "ok", "output": str(out_path), "cached": True}
+    except OSError:
+        pass
+    
+    return script, out_path
+
+
+async def extract_workflow_for(video_path: Path) -> Dict[str, str]:
+    """
+    Run the external extractor for a single mp4 and write:
+    ./.workflows/<filename_without_ext>_workflow.json
+    Returns a dict with status and paths; "cached" is set when an existing
+    output newer than the video was reused.
+    
+    The extractor runs in a shared process pool so the event loop keeps
+    serving other requests while it works.
+    """
+    state = get_state()
+    
+    # The checks below touch the filesystem; run them in a thread so a large
+    # batch doesn't stall the event loop before any worker starts
+    planned = await asyncio.to_thread(_plan_extraction, video_path)
+    if isinstance(planned, dict):
+        return planned
+    script, out_path = planned
+    
+    pool = _get_pool()
     try:
-        cp = subprocess.run(cmd, capture_output=True, text=True, check=False)
-        if cp.returncode == 0:
-            state.logger.info(f"EXTRACT success file={video_path.name} out={out_path}")
-            return {"name": video_path.name, "status": "ok", "output": str(out_path)}
-        else:
-            state.logger.warning(f"EXTRACT failed file={video_path.name} rc={cp.returncode} stderr={cp.stderr.strip()}")
-            return {"name": video_path.name, "status": "error", "error": f"rc={cp.returncode}", "stderr": cp.stderr}
-    except FileNotFoundError:
-        return {"name": video_path.name, "status": "error", "error": "python_not_found"}
\ No newline at end of file
+        loop = asyncio.get_running_loop()
+        rc, stderr = await loop.run_in_executor(
+            pool, _run_extractor, str(script), str(video_path), str(out_path)
+        )
+    except BrokenProcessPool as e:
+        _discard_pool(pool)
+        state.logger.warning(f"EXTRACT failed file={video_path.name} error=worker crashed ({e})")
+        return {"name": video_path.name, "status": "error", "error": "worker_failed"}
+    except Exception as e:
+        state.logger.warning(f"EXTRACT failed file={video_path.name} error={e}")
+        return {"name": video_path.name, "status": "error", "error": "worker_failed"}
+    
+    if rc == 0:
+        state.logger.info(f"EXTRACT success file={video_path.name} out={out_path}")
+        return {"name": video_path.name, "status": "ok", "output": str(out_path)}
+    else:
+        state.logger.warning(f"EXTRACT failed file={video_path.name} rc={rc} stderr={stderr.strip()}")
+        return {"name": video_path.name, "status": "error", "error": f"rc={rc}", "stderr": stderr}
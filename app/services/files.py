@@ -1,17 +1,46 @@
 """File management service for media discovery, scoring, and logging."""
 
+import atexit
 import datetime as dt
-import json
+import fnmatch
+import functools
+import hashlib
 import logging
+import logging.handlers
+import os
+import queue
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Iterable, List, Dict, Optional, Tuple
 
 from ..state import get_state
+from .score_store import ScoreStore, get_score_store, peek_score_store
 
 
+def _scores_dir_path(directory: Path) -> Path:
+    """Path of the scores directory for a directory, without touching the filesystem."""
+    return directory / ".scores"
+
+
+def _fallback_scores_dir_path(directory: Path) -> Path:
+    """Path used for scores when the media directory isn't writable."""
+    return Path.home() / ".media_scoring" / "scores" / directory.name
+
+
+@functools.lru_cache(maxsize=64)
 def get_scores_dir_for(directory: Path) -> Path:
-    """Get and create scores directory for a given directory."""
-    sdir = directory / ".scores"
+    """Get and create scores directory for a given directory.
+    
+    Memoized: this sits under every score write, so the directory is only
+    checked/created the first time it is seen. Reads don't create it; see
+    _score_store_for_read.
+    """
+    sdir = _scores_dir_path(directory)
+    if (sdir / ".log").is_dir():
+        return sdir
     
     try:
         sdir.mkdir(exist_ok=True, parents=True)
@@ -24,7 +53,7 @@ def get_scores_dir_for(directory: Path) -> Path:
         
         # Try user's home directory first
         try:
-            fallback_dir = Path.home() / ".media_scoring" / "scores" / directory.name
+            fallback_dir = _fallback_scores_dir_path(directory)
             fallback_dir.mkdir(parents=True, exist_ok=True)
             (fallback_dir / ".log").mkdir(exist_ok=True, parents=True)
             logging.getLogger(__name__).warning(
@@ -44,60 +73,120 @@ def get_scores_dir_for(directory: Path) -> Path:
     return sdir
 
 
-def get_sidecar_path_for(video_path: Path) -> Path:
-    """Get sidecar file path for a media file."""
-    return get_scores_dir_for(video_path.parent) / f"{video_path.name}.json"
+def get_score_store_for(directory: Path) -> ScoreStore:
+    """Get the score index for a media directory, creating it if needed."""
+    return get_score_store(get_scores_dir_for(directory))
+
+
+def _score_store_for_read(directory: Path) -> Optional[ScoreStore]:
+    """Get the score index for reading, or None if nothing was ever scored.
+    
+    Unlike get_score_store_for this never creates directories: an already
+    open index is a dict lookup, and otherwise an existing scores directory
+    is opened. (A temporary last-resort scores directory is not found here,
+    but scores written there don't outlive the process anyway.) A scores
+    directory that can't be opened at all is skipped for the next candidate.
+    """
+    candidates = (_scores_dir_path(directory), _fallback_scores_dir_path(directory))
+    for sdir in candidates:
+        store = peek_score_store(sdir)
+        if store is not None:
+            return store
+    for sdir in candidates:
+        if sdir.is_dir():
+            try:
+                return get_score_store(sdir)
+            except (sqlite3.Error, OSError) as e:
+                logging.getLogger(__name__).warning(f"Cannot open scores in {sdir}: {e}")
+    return None
+
+
+def _valid_score(val: int) -> int:
+    """Clamp out-of-range scores to 0."""
+    if val < -1 or val > 5:
+        return 0
+    return val
 
 
 def read_score(video_path: Path) -> Optional[int]:
-    """Read score from sidecar file."""
-    scp = get_sidecar_path_for(video_path)
-    if not scp.exists():
-        return None
+    """Read score from the score index."""
     try:
-        data = json.loads(scp.read_text(encoding="utf-8"))
-        val = int(data.get("score", 0))
-        if val < -1 or val > 5:
-            return 0
-        return val
+        store = _score_store_for_read(video_path.parent)
+        entry = store.get(video_path.name) if store is not None else None
     except Exception:
         return None
+    if entry is None:
+        return None
+    return _valid_score(entry[0])
 
 
 def read_favourite(video_path: Path) -> bool:
-    """Read favourite status from sidecar file."""
-    scp = get_sidecar_path_for(video_path)
-    if not scp.exists():
-        return False
+    """Read favourite status from the score index."""
     try:
-        data = json.loads(scp.read_text(encoding="utf-8"))
-        return bool(data.get("favourite", False))
+        store = _score_store_for_read(video_path.parent)
+        entry = store.get(video_path.name) if store is not None else None
     except Exception:
         return False
+    return entry[1] if entry is not None else False
 
 
-def write_score(video_path: Path, score: int) -> None:
-    """Write score to sidecar file and database."""
-    # Read existing data to preserve favourite status
-    scp = get_sidecar_path_for(video_path)
-    existing_data = {}
-    if scp.exists():
+def load_all_scores(directory: Path) -> Dict[str, Tuple[int, bool]]:
+    """Load {name: (score, favourite)} for every scored file in a directory."""
+    try:
+        store = _score_store_for_read(directory)
+        entries = store.get_all() if store is not None else {}
+    except Exception as e:
+        logging.getLogger(__name__).warning(f"Failed to read scores for {directory}: {e}")
+        return {}
+    return {name: (_valid_score(score), fav) for name, (score, fav) in entries.items()}
+
+
+def scores_version(directories: Iterable[Path]) -> str:
+    """Short token that changes when scores in these directories change on disk.
+    
+    Covers writes by other processes and new legacy sidecars, which
+    listing_version can't see. Directories without scores contribute a
+    placeholder, so one being created changes the token too.
+    """
+    parts = []
+    for directory in directories:
         try:
-            existing_data = json.loads(scp.read_text(encoding="utf-8"))
+            store = _score_store_for_read(directory)
+            version = store.version() if store is not None else (0, 0)
         except Exception:
-            pass
+            version = (0, 0)
+        parts.append(f"{version[0]:x}.{version[1]:x}")
+    if len(parts) == 1:
+        return parts[0]
+    return hashlib.blake2b("|".join(parts).encode(), digest_size=8).hexdigest()
+
+
+def read_scores(paths: Iterable[Path]) -> List[Tuple[Optional[int], bool]]:
+    """Read (score, favourite) for many media files.
+
+    Loads each directory's scores once and joins them by name, instead of
+    looking every file up on its own.
+    """
+    by_dir: Dict[Path, Dict[str, Tuple[int, bool]]] = {}
+    results: List[Tuple[Optional[int], bool]] = []
+    for p in paths:
+        scores = by_dir.get(p.parent)
+        if scores is None:
+            scores = by_dir[p.parent] = load_all_scores(p.parent)
+        results.append(scores.get(p.name, (None, False)))
+    return results
+
+
+def write_score(video_path: Path, score: int) -> None:
+    """Write score to the score index and database."""
+    get_score_store_for(video_path.parent).set_score(
+        video_path.name, int(score), dt.datetime.now().isoformat(timespec="seconds")
+    )
     
-    # Write to sidecar file (existing functionality)
-    payload = {
-        "file": video_path.name,
-        "score": int(score),
-        "favourite": existing_data.get("favourite", False),
-        "updated": dt.datetime.now().isoformat(timespec="seconds"),
-    }
-    scp.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    state = get_state()
+    state.bump_listing_version()
     
     # Write to database if enabled
-    state = get_state()
     if state.database_enabled:
         try:
             with state.get_database_service() as db:
@@ -106,28 +195,43 @@ def write_score(video_path: Path, score: int) -> None:
             state.logger.error(f"Failed to update score in database: {e}")
 
 
-def write_favourite(video_path: Path, favourite: bool) -> None:
-    """Write favourite status to sidecar file and database."""
-    # Read existing data to preserve score
-    scp = get_sidecar_path_for(video_path)
-    existing_data = {}
-    if scp.exists():
-        try:
-            existing_data = json.loads(scp.read_text(encoding="utf-8"))
-        except Exception:
-            pass
+def write_scores(scores: List[Tuple[Path, int]]) -> None:
+    """Write several scores, with one index transaction per directory.
     
-    # Write to sidecar file
-    payload = {
-        "file": video_path.name,
-        "score": existing_data.get("score", 0),
-        "favourite": bool(favourite),
-        "updated": dt.datetime.now().isoformat(timespec="seconds"),
-    }
-    scp.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    If a file appears more than once, its last score wins.
+    """
+    by_dir: Dict[Path, Dict[str, int]] = {}
+    for video_path, score in scores:
+        by_dir.setdefault(video_path.parent, {})[video_path.name] = int(score)
+    
+    updated = dt.datetime.now().isoformat(timespec="seconds")
+    for directory, dir_scores in by_dir.items():
+        get_score_store_for(directory).set_scores(dir_scores, updated)
+    
+    state = get_state()
+    state.bump_listing_version()
     
     # Write to database if enabled
+    if state.database_enabled:
+        try:
+            with state.get_database_service() as db:
+                for directory, dir_scores in by_dir.items():
+                    for name, score in dir_scores.items():
+                        db.update_media_file_score(directory / name, score)
+        except Exception as e:
+            state.logger.error(f"Failed to update scores in database: {e}")
+
+
+def write_favourite(video_path: Path, favourite: bool) -> None:
+    """Write favourite status to the score index and database."""
+    get_score_store_for(video_path.parent).set_favourite(
+        video_path.name, bool(favourite), dt.datetime.now().isoformat(timespec="seconds")
+    )
+    
     state = get_state()
+    state.bump_listing_version()
+    
+    # Write to database if enabled
     if state.database_enabled:
         try:
             with state.get_database_service() as db:
@@ -139,9 +243,100 @@ def write_favourite(video_path: Path, favourite: bool) -> None:
 
 def match_union_pattern(directory: Path, pattern: str) -> List[Path]:
     """Match files using union glob pattern (e.g., '*.mp4|*.png|*.jpg')."""
+    if "/" in (pattern or "") or "**" in (pattern or ""):
+        # Recursive patterns depend on subdirectories the mtime key can't see
+        return _match_union_pattern_uncached(directory, pattern)
+    try:
+        mtime_ns = os.stat(directory).st_mtime_ns
+    except OSError:
+        return _match_union_pattern_uncached(directory, pattern)
+    # The directory mtime changes whenever entries are added, removed or
+    # renamed, so it is a cheap validity key for the cached listing.
+    return list(_match_union_pattern_cached(str(directory), pattern, mtime_ns))
+
+
+@functools.lru_cache(maxsize=32)
+def _match_union_pattern_cached(directory: str, pattern: str, mtime_ns: int) -> Tuple[Path, ...]:
+    return tuple(_match_union_pattern_uncached(Path(directory), pattern))
+
+
+def _match_union_pattern_uncached(directory: Path, pattern: str) -> List[Path]:
+    compiled = _compile_union_pattern(pattern)
+    if isinstance(compiled, list):
+        return _match_union_pattern_glob(directory, compiled)
+    matches, match_hidden = compiled
+
+    # Single directory pass: scandir hands back names and file types from one
+    # getdents batch, so non-matching entries never cost a stat() call.
+    names = set()
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                # Like glob, wildcards never match a leading dot
+                if entry.name.startswith(".") and not match_hidden:
+                    continue
+                if not matches(entry.name):
+                    continue
+                try:
+                    # is_file() answers from d_type for regular files; only
+                    # symlinks cost a stat, and those must be followed so
+                    # linked media is listed like it was with glob.
+                    if entry.is_file():
+                        names.add(entry.name)
+                except (PermissionError, OSError) as e:
+                    # Log permission issues but continue with other files
+                    logging.getLogger(__name__).warning(f"Permission denied accessing {entry.path}: {e}")
+    except (PermissionError, OSError) as e:
+        logging.getLogger(__name__).warning(f"Cannot scan directory {directory}: {e}")
+        return []
+    return [directory / name for name in sorted(names)]
+
+
+@functools.lru_cache(maxsize=32)
+def _compile_union_pattern(pattern: str):
+    """Parse and compile a union pattern once per distinct pattern string.
+    
+    Returns (matches, match_hidden), where matches(name) tests a directory
+    entry name, or the list of sub-patterns if any of them needs glob.
+    """
     pats = [p.strip() for p in (pattern or "").split("|") if p.strip()]
     if not pats:
         pats = ["*.mp4"]
+    if any("/" in pat or "**" in pat for pat in pats):
+        return pats
+
+    match_hidden = any(pat.startswith(".") for pat in pats)
+
+    # Plain "*.ext" alternatives (the common case) reduce to one suffix check
+    suffixes = _simple_suffixes(pats)
+    if suffixes is not None:
+        def matches(name: str) -> bool:
+            return os.path.normcase(name).endswith(suffixes)
+    else:
+        # Translate the globs into one anchored alternation, compiled once,
+        # rather than going through fnmatch's normcase + pattern cache (or
+        # one regex per alternative) for every entry
+        parts = [fnmatch.translate(os.path.normcase(pat)).removesuffix(r"\Z") for pat in pats]
+        union = re.compile("(?:" + "|".join(parts) + r")\Z")
+        
+        def matches(name: str) -> bool:
+            return union.match(os.path.normcase(name)) is not None
+    return matches, match_hidden
+
+
+def _simple_suffixes(pats: List[str]) -> Optional[Tuple[str, ...]]:
+    """Return suffixes if every pattern is a plain '*.ext', else None."""
+    suffixes = []
+    for pat in pats:
+        rest = pat[1:]
+        if not pat.startswith("*.") or any(c in rest for c in "*?["):
+            return None
+        suffixes.append(os.path.normcase(rest))
+    return tuple(suffixes)
+
+
+def _match_union_pattern_glob(directory: Path, pats: List[str]) -> List[Path]:
+    """Glob-based matching for patterns that reach into subdirectories."""
     seen: Dict[Path, Path] = {}
     for pat in pats:
         for p in directory.glob(pat):
@@ -155,49 +350,192 @@ def match_union_pattern(directory: Path, pattern: str) -> List[Path]:
     return sorted(seen.values())
 
 
+def resolve_media_path(directory: Path, name: str) -> Path:
+    """Resolve a request-supplied name against a media directory.
+    
+    Resolved on every call, never cached: a file can be swapped for a
+    symlink between requests, and callers check the result with
+    relative_to() right before serving it.
+    """
+    return (directory / name).resolve()
+
+
+# Extensions the app can display, for code that counts or lists media
+# outside the configured scan pattern
+IMAGE_EXTENSIONS = frozenset({".png", ".jpg", ".jpeg"})
+VIDEO_EXTENSIONS = frozenset({".mp4"})
+MEDIA_EXTENSIONS = IMAGE_EXTENSIONS | VIDEO_EXTENSIONS
+
+
+def media_extension(name: str) -> Optional[str]:
+    """Return the lower-cased extension of a media file name, else None.
+    
+    Works on the bare name, so callers can skip non-media entries before
+    building a Path or stat()ing them.
+    """
+    ext = os.path.splitext(name)[1].lower()
+    return ext if ext in MEDIA_EXTENSIONS else None
+
+
+def summarize_subdirectory(directory: Path) -> Tuple[int, bool]:
+    """Count a directory's media files and check it has visible subdirectories.
+    
+    One scandir answers both: entry types come from the listing itself, so
+    only media files (and symlinks) cost a stat. An unreadable directory
+    counts as empty.
+    """
+    media_files = 0
+    has_children = False
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                if media_extension(entry.name) and entry.is_file():
+                    media_files += 1
+                elif not has_children and not entry.name.startswith('.') and entry.is_dir():
+                    has_children = True
+    except PermissionError:
+        pass
+    return media_files, has_children
+
+
 def discover_files(directory: Path, pattern: str) -> List[Path]:
     """Discover media files in directory matching pattern."""
     return match_union_pattern(directory, pattern)
 
 
+# One queue-backed handler per recently used media directory, so switching
+# back to a directory (or rescanning the current one) doesn't reopen its log
+# file. Request threads only enqueue records; a QueueListener thread owns the
+# FileHandler and does the formatting and disk writes. Only the most recent
+# directories keep their file and listener thread open.
+_MAX_LOG_HANDLERS = 8
+_log_handlers: "OrderedDict[Path, Tuple[logging.Handler, logging.handlers.QueueListener]]" = OrderedDict()
+_log_handlers_lock = threading.Lock()
+
+
+def _get_log_handler(directory: Path) -> logging.Handler:
+    """Get the cached log handler for a directory, creating it on a miss."""
+    with _log_handlers_lock:
+        entry = _log_handlers.get(directory)
+        if entry is not None:
+            _log_handlers.move_to_end(directory)
+            return entry[0]
+
+        log_dir = get_scores_dir_for(directory) / ".log"
+        log_file = log_dir / "video_scorer.log"
+        fh = logging.FileHandler(log_file, encoding="utf-8")
+        fh.setLevel(logging.DEBUG)
+        fh.setFormatter(logging.Formatter("%(asctime)s | %(levelname)-5s | %(message)s"))
+
+        log_queue: queue.Queue = queue.Queue(-1)
+        listener = logging.handlers.QueueListener(log_queue, fh, respect_handler_level=True)
+        listener.start()
+
+        qh = logging.handlers.QueueHandler(log_queue)
+        qh.setLevel(logging.DEBUG)
+        _log_handlers[directory] = (qh, listener)
+
+        while len(_log_handlers) > _MAX_LOG_HANDLERS:
+            _, (_, old_listener) = _log_handlers.popitem(last=False)
+            _stop_log_listener(old_listener)
+    return qh
+
+
+def _stop_log_listener(listener: logging.handlers.QueueListener) -> None:
+    """Flush a listener's queue, stop its thread and close its files."""
+    listener.stop()
+    for h in listener.handlers:
+        h.close()
+
+
+@atexit.register
+def _stop_log_listeners() -> None:
+    with _log_handlers_lock:
+        while _log_handlers:
+            _, (_, listener) = _log_handlers.popitem()
+            _stop_log_listener(listener)
+
+
 def setup_logging(directory: Path) -> logging.Logger:
     """Setup logging for the application."""
     logger = logging.getLogger("video_scorer_fastapi")
     logger.setLevel(logging.DEBUG)
     
-    # Remove existing handlers
+    fh = _get_log_handler(directory)
+    if logger.handlers == [fh]:
+        return logger
+    
+    # Swap in the handler for this directory
     for h in list(logger.handlers):
         logger.removeHandler(h)
-    
-    # Create file handler
-    log_dir = get_scores_dir_for(directory) / ".log"
-    log_file = log_dir / "video_scorer.log"
-    fh = logging.FileHandler(log_file, encoding="utf-8")
-    fh.setLevel(logging.DEBUG)
-    
-    # Create formatter
-    fmt = logging.Formatter("%(asctime)s | %(levelname)-5s | %(message)s")
-    fh.setFormatter(fmt)
-    
     logger.addHandler(fh)
     logger.info(f"Logger initialized. dir={directory}")
     
     return logger
 
 
+def _listing_mtime_ns(directory: Path, pattern: str) -> Optional[int]:
+    """Directory mtime that validates a listing, or None if it can't.
+    
+    Recursive patterns depend on subdirectories the mtime doesn't cover.
+    """
+    if "/" in (pattern or "") or "**" in (pattern or ""):
+        return None
+    try:
+        return os.stat(directory).st_mtime_ns
+    except OSError:
+        return None
+
+
+# Held while the directory, pattern and file list are replaced together, so a
+# lazy rescan from a listing request can't publish files from the directory a
+# concurrent switch_directory is leaving.
+_listing_lock = threading.Lock()
+
+
+def refresh_file_list() -> bool:
+    """Re-discover files if the media directory changed since the last scan.
+    
+    Costs one stat() when nothing changed, so listings can call it on every
+    request and pick up files added or removed by other programs without a
+    manual rescan. Returns True if the file list was replaced.
+    """
+    state = get_state()
+    with _listing_lock:
+        if state.scan_mtime_ns is None:
+            return False
+        mtime_ns = _listing_mtime_ns(state.video_dir, state.file_pattern)
+        if mtime_ns is None or mtime_ns == state.scan_mtime_ns:
+            return False
+        state.scan_mtime_ns = mtime_ns
+        file_list = discover_files(state.video_dir, state.file_pattern)
+        state.set_file_list(file_list)
+    state.logger.info(f"RESCAN dir={state.video_dir} files={len(file_list)}")
+    return True
+
+
 def switch_directory(new_dir: Path, pattern: Optional[str] = None) -> List[Path]:
     """Switch to a new directory and discover files."""
     state = get_state()
     
-    # Update state
-    state.update_directory(new_dir, pattern)
+    # Re-verify scores directories on each scan (one stat each), in case one
+    # was removed; reads and writes between scans use the memoized result.
+    get_scores_dir_for.cache_clear()
+    # An explicit scan always lists the directory again: changes within the
+    # filesystem's mtime granularity don't move the listing cache's key.
+    _match_union_pattern_cached.cache_clear()
     
-    # Setup logging for new directory
-    setup_logging(new_dir)
-    
-    # Discover files
-    file_list = discover_files(new_dir, state.file_pattern)
-    state.file_list = file_list
+    with _listing_lock:
+        # Update state
+        state.update_directory(new_dir, pattern)
+        
+        # Setup logging for new directory
+        setup_logging(new_dir)
+        
+        # Discover files
+        state.scan_mtime_ns = _listing_mtime_ns(new_dir, state.file_pattern)
+        file_list = discover_files(new_dir, state.file_pattern)
+        state.set_file_list(file_list)
     
     state.logger.info(f"SCAN dir={new_dir} pattern={state.file_pattern} files={len(file_list)}")
     
@@ -206,15 +544,15 @@ def switch_directory(new_dir: Path, pattern: Optional[str] = None) -> List[Path]
         from .metadata import extract_and_store_metadata
         
         try:
+            scores = read_scores(file_list)
             with state.get_database_service() as db:
-                for file_path in file_list:
+                for file_path, (stored_score, _) in zip(file_list, scores):
                     # Get or create media file record  
                     media_file = db.get_or_create_media_file(file_path)
                     
-                    # Read score from sidecar if exists and update database
-                    sidecar_score = read_score(file_path)
-                    if sidecar_score is not None and media_file.score != sidecar_score:
-                        media_file.score = sidecar_score
+                    # Update database from the score index if an entry exists
+                    if stored_score is not None and media_file.score != stored_score:
+                        media_file.score = stored_score
                 
                 state.logger.info(f"Synced {len(file_list)} files to database")
         except Exception as e:
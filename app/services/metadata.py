@@ -11,6 +11,7 @@ from pathlib import Path
 from typing import Dict, Optional, Any
 
 from ..state import get_state
+from ..utils.json_response import json_loads
 from ..utils.png_chunks import read_png_parameters_text
 from ..utils.prompt_parser import parse_png_prompt_text
 
@@ -150,7 +151,7 @@ def extract_video_metadata(file_path: Path) -> Dict[str, Any]:
             "-of", "json", str(file_path)
         ]
         cp = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        info = json.loads(cp.stdout or "{}")
+        info = json_loads(cp.stdout or "{}")
         
         if isinstance(info, dict) and info.get("streams"):
             stream = info["streams"][0]
@@ -227,7 +228,7 @@ def extract_workflow_from_video(file_path: Path) -> Dict[str, Any]:
             "-of", "json", str(file_path)
         ]
         cp = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        info = json.loads(cp.stdout or "{}")
+        info = json_loads(cp.stdout or "{}")
         
         if isinstance(info, dict) and info.get("format", {}).get("tags"):
             tags = info["format"]["tags"]
@@ -236,7 +237,7 @@ def extract_workflow_from_video(file_path: Path) -> Dict[str, Any]:
             for tag_key, tag_value in tags.items():
                 if "workflow" in tag_key.lower() or "comfyui" in tag_key.lower():
                     try:
-                        workflow_json = json.loads(tag_value)
+                        workflow_json = json_loads(tag_value)
                         workflow_data["workflow_data"] = workflow_json
                         break
                     except json.JSONDecodeError:
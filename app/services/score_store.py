@@ -0,0 +1,360 @@
+"""SQLite-backed score index, one database per scores directory."""
+
+import contextlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+INDEX_DB_NAME = "index.db"
+
+
+class ScoreStore:
+    """Scores and favourites for every media file in one directory.
+
+    Replaces the per-file ``.scores/<name>.json`` sidecars with a single
+    SQLite table, so loading a directory is one query instead of N file
+    opens. Legacy sidecars are imported the first time they are seen, for
+    names not in the index yet; the index is authoritative after that, so
+    later edits to an imported sidecar are ignored.
+
+    The table is loaded into memory once and kept in sync on every write.
+    Reads only ask SQLite for its data_version, which changes when another
+    connection (e.g. a second server process) commits, and reload on change.
+    """
+
+    def __init__(self, scores_dir: Path):
+        self.scores_dir = scores_dir
+        self.db_path = scores_dir / INDEX_DB_NAME
+        self._lock = threading.Lock()
+        self._entries: Optional[Dict[str, Tuple[int, bool]]] = None
+        self._data_version: Optional[int] = None
+        self._sidecar_dir_mtime_ns: Optional[int] = None
+        self.read_only = False
+        self._conn: Optional[sqlite3.Connection] = None
+        try:
+            self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            self._setup_database()
+        except sqlite3.Error as e:
+            # Typically a scores directory we may read but not write
+            logger.warning(f"Cannot open {self.db_path} for writing ({e}); reading scores only")
+            if self._conn is not None:
+                self._conn.close()
+            self._conn = self._open_read_only()
+            self.read_only = True
+        self._import_sidecars()
+
+    def _setup_database(self) -> None:
+        """Configure the connection and create the scores table.
+
+        WAL with synchronous=NORMAL turns each score write into an append to
+        the write-ahead log rather than a rewrite-and-fsync of the database;
+        a power loss can drop the last few scores but never corrupt the file.
+        
+        WAL needs shared memory between the processes using the database,
+        which network filesystems (NFS, SMB) don't provide, so media
+        directories on a share keep SQLite's default rollback journal.
+        """
+        with self._lock:
+            if _on_network_filesystem(self.scores_dir):
+                logger.info(f"{self.db_path} is on a network filesystem; not using WAL")
+                self._conn.execute("PRAGMA journal_mode=DELETE")
+            else:
+                mode = self._conn.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+                if mode.lower() == "wal":
+                    self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._lock, self._conn:
+            _create_scores_table(self._conn)
+
+    def _open_read_only(self) -> sqlite3.Connection:
+        """Load the index (if any) into an in-memory copy that can't be saved.
+
+        Used when the scores directory isn't writable: the on-disk index is
+        copied in through a read-only attach, and legacy sidecars are then
+        imported into the copy as usual, so every score still reads back.
+        Writes are refused; see _check_writable.
+        """
+        conn = sqlite3.connect(":memory:", uri=True, check_same_thread=False)
+        with conn:
+            _create_scores_table(conn)
+        if not self.db_path.exists():
+            return conn
+        # immutable=1 also reads a WAL-mode index whose -shm file can't be created
+        for params in ("mode=ro", "mode=ro&immutable=1"):
+            try:
+                conn.execute("ATTACH DATABASE ? AS disk", (f"{self.db_path.absolute().as_uri()}?{params}",))
+                try:
+                    with conn:
+                        conn.execute(
+                            "INSERT INTO scores (name, score, favourite, updated) "
+                            "SELECT name, score, favourite, updated FROM disk.scores"
+                        )
+                finally:
+                    conn.execute("DETACH DATABASE disk")
+                return conn
+            except sqlite3.Error as e:
+                error = e
+        logger.warning(f"Cannot read {self.db_path}: {error}")
+        return conn
+
+    def _check_writable(self) -> None:
+        """Refuse writes to a store opened read-only, rather than losing them."""
+        if self.read_only:
+            raise PermissionError(f"Scores directory {self.scores_dir} is not writable")
+
+    def _import_sidecars(self) -> None:
+        """Import legacy JSON sidecars that are not in the index yet.
+
+        Only sidecars for names missing from the index are read, so after the
+        first run this costs a single directory listing. The import is
+        one-time per name: INSERT OR IGNORE never overwrites an entry, which
+        may have been changed in the app since.
+        """
+        try:
+            self._sidecar_dir_mtime_ns = os.stat(self.scores_dir).st_mtime_ns
+            with os.scandir(self.scores_dir) as it:
+                sidecars = {
+                    e.name[:-5]: e.path for e in it
+                    if e.name.endswith(".json") and e.is_file()
+                }
+        except OSError as e:
+            logger.warning(f"Cannot scan scores directory {self.scores_dir}: {e}")
+            return
+        if not sidecars:
+            return
+
+        with self._lock:
+            known = {row[0] for row in self._conn.execute("SELECT name FROM scores")}
+        pending = [(name, path) for name, path in sidecars.items() if name not in known]
+        if not pending:
+            return
+
+        workers = min(32, (os.cpu_count() or 1) * 4, len(pending))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            loaded = list(pool.map(_load_legacy_sidecar, (path for _, path in pending)))
+
+        rows = []
+        for (name, _), data in zip(pending, loaded):
+            if data is None:
+                continue
+            try:
+                score = int(data.get("score", 0))
+            except (TypeError, ValueError):
+                score = 0
+            rows.append((name, score, int(bool(data.get("favourite", False))), data.get("updated")))
+
+        with self._lock, self._own_commit():
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO scores (name, score, favourite, updated) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._entries = None
+        logger.info(f"Imported {len(rows)} legacy sidecars into {self.db_path}")
+
+    @contextlib.contextmanager
+    def _own_commit(self):
+        """Commit a transaction without it counting as a sidecar change.
+
+        Outside WAL mode each commit creates and deletes a journal file next
+        to the index, which moves the scores directory's mtime just like a
+        new sidecar would. If nothing else had changed the directory before
+        the commit, the new mtime is taken as already scanned. Must be
+        called with the lock held.
+        """
+        before = _mtime_ns(self.scores_dir)
+        with self._conn:
+            yield
+        if before is not None and before == self._sidecar_dir_mtime_ns:
+            self._sidecar_dir_mtime_ns = _mtime_ns(self.scores_dir)
+
+    def _refresh_sidecars(self) -> None:
+        """Re-import sidecars if the scores directory changed since the last scan.
+
+        Tools that still write ``<name>.json`` sidecars change the directory's
+        mtime, so a single stat tells whether a new listing is needed.
+        """
+        try:
+            mtime_ns = os.stat(self.scores_dir).st_mtime_ns
+        except OSError:
+            return
+        if mtime_ns != self._sidecar_dir_mtime_ns:
+            self._import_sidecars()
+
+    def _load_entries(self) -> Dict[str, Tuple[int, bool]]:
+        """Return the in-memory copy of the table, loading it on first use.
+
+        Must be called with the lock held.
+        """
+        data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if self._entries is None or data_version != self._data_version:
+            rows = self._conn.execute("SELECT name, score, favourite FROM scores").fetchall()
+            self._entries = {name: (score, bool(favourite)) for name, score, favourite in rows}
+            self._data_version = data_version
+        return self._entries
+
+    def version(self) -> Tuple[int, int]:
+        """Return (data_version, scores directory mtime) as a change marker.
+
+        data_version moves when another connection commits, and the
+        directory mtime when a legacy sidecar is added or replaced, so
+        together they catch score changes made outside this process. This
+        connection's own writes don't move data_version; callers track those.
+        """
+        try:
+            mtime_ns = os.stat(self.scores_dir).st_mtime_ns
+        except OSError:
+            mtime_ns = 0
+        with self._lock:
+            data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        return data_version, mtime_ns
+
+    def get(self, name: str) -> Optional[Tuple[int, bool]]:
+        """Return (score, favourite) for a file, or None if it has no entry."""
+        with self._lock:
+            return self._load_entries().get(name)
+
+    def get_all(self) -> Dict[str, Tuple[int, bool]]:
+        """Return {name: (score, favourite)} for every entry in the index."""
+        self._refresh_sidecars()
+        with self._lock:
+            return dict(self._load_entries())
+
+    def set_score(self, name: str, score: int, updated: str) -> None:
+        """Set the score for a file, preserving its favourite flag."""
+        self._check_writable()
+        with self._lock:
+            entries = self._load_entries()
+            with self._own_commit():
+                self._conn.execute(
+                    "INSERT INTO scores (name, score, updated) VALUES (?, ?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET score = excluded.score, updated = excluded.updated",
+                    (name, int(score), updated),
+                )
+            entries[name] = (int(score), entries.get(name, (0, False))[1])
+
+    def set_scores(self, scores: Dict[str, int], updated: str) -> None:
+        """Set several scores in one transaction, preserving favourite flags."""
+        self._check_writable()
+        with self._lock:
+            entries = self._load_entries()
+            with self._own_commit():
+                self._conn.executemany(
+                    "INSERT INTO scores (name, score, updated) VALUES (?, ?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET score = excluded.score, updated = excluded.updated",
+                    [(name, int(score), updated) for name, score in scores.items()],
+                )
+            for name, score in scores.items():
+                entries[name] = (int(score), entries.get(name, (0, False))[1])
+
+    def set_favourite(self, name: str, favourite: bool, updated: str) -> None:
+        """Set the favourite flag for a file, preserving its score."""
+        self._check_writable()
+        with self._lock:
+            entries = self._load_entries()
+            with self._own_commit():
+                self._conn.execute(
+                    "INSERT INTO scores (name, favourite, updated) VALUES (?, ?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET favourite = excluded.favourite, updated = excluded.updated",
+                    (name, int(bool(favourite)), updated),
+                )
+            entries[name] = (entries.get(name, (0, False))[0], bool(favourite))
+
+    def close(self) -> None:
+        """Close the underlying connection."""
+        with self._lock:
+            self._conn.close()
+
+
+# Filesystem types (as listed in /proc/mounts) that can't share WAL's index
+_NETWORK_FILESYSTEMS = frozenset({
+    "nfs", "nfs4", "cifs", "smb3", "smbfs", "9p", "afs", "ceph", "glusterfs",
+    "fuse.sshfs", "fuse.rclone", "fuse.glusterfs", "fuse.cephfs", "davfs",
+})
+
+
+def _on_network_filesystem(path: Path) -> bool:
+    """Best-effort check whether path lives on a network filesystem.
+
+    Looks up the path's mount in /proc/mounts on Linux, and treats UNC paths
+    as network shares on Windows; anywhere else the answer is False.
+    """
+    path_str = str(path.resolve())
+    if path_str.startswith("\\\\"):
+        return True
+    try:
+        with open("/proc/mounts", encoding="utf-8") as f:
+            mounts = [line.split()[1:3] for line in f]
+    except OSError:
+        return False
+    best_mount, best_type = "", ""
+    for mount_point, fs_type in mounts:
+        # /proc/mounts escapes spaces and other specials as octal
+        mount_point = mount_point.replace("\\040", " ").replace("\\011", "\t")
+        prefix = mount_point.rstrip("/") + "/"
+        if (path_str == mount_point or path_str.startswith(prefix)) and len(mount_point) >= len(best_mount):
+            best_mount, best_type = mount_point, fs_type
+    return best_type in _NETWORK_FILESYSTEMS
+
+
+def _mtime_ns(path: Path) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _create_scores_table(conn: sqlite3.Connection) -> None:
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS scores (
+            name TEXT PRIMARY KEY,
+            score INTEGER NOT NULL DEFAULT 0,
+            favourite INTEGER NOT NULL DEFAULT 0,
+            updated TEXT
+        )
+    """)
+
+
+def _load_legacy_sidecar(path: str) -> Optional[dict]:
+    """Read one legacy JSON sidecar, or None if it is unreadable."""
+    try:
+        with open(path, "rb") as f:
+            data = json.loads(f.read())
+        return data if isinstance(data, dict) else None
+    except Exception:
+        return None
+
+
+_stores: Dict[Path, ScoreStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_score_store(scores_dir: Path) -> ScoreStore:
+    """Get the shared ScoreStore for a scores directory, opening it on first use."""
+    store = _stores.get(scores_dir)
+    if store is not None:
+        return store
+    with _stores_lock:
+        store = _stores.get(scores_dir)
+        if store is None:
+            store = ScoreStore(scores_dir)
+            _stores[scores_dir] = store
+    return store
+
+
+def peek_score_store(scores_dir: Path) -> Optional[ScoreStore]:
+    """Get the ScoreStore for a scores directory only if it is already open."""
+    return _stores.get(scores_dir)
+
+
+def close_score_stores() -> None:
+    """Close every open ScoreStore."""
+    with _stores_lock:
+        for store in _stores.values():
+            store.close()
+        _stores.clear()
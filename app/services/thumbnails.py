@@ -1,27 +1,54 @@
 """Thumbnail generation service for images and videos."""
 
+import functools
+import os
 import subprocess
 import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import List
+from typing import List, Optional, Tuple
 
 from ..state import get_state
+from ..utils.process_pool import new_process_pool, process_pool_workers
+from .files import IMAGE_EXTENSIONS, VIDEO_EXTENSIONS, media_extension
 
 try:
     from PIL import Image
 except ImportError:
     Image = None
 
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process guard, see _run_thumbnail_generation
+    fcntl = None
+
+# Thumbnails are already spread over one process per core, so each libvips
+# instance runs single-threaded unless configured otherwise. The variable is
+# read when libvips starts, so it has to be set before the import.
+os.environ.setdefault("VIPS_CONCURRENCY", "1")
+try:
+    import pyvips
+except (ImportError, OSError):  # OSError: pyvips installed without libvips
+    pyvips = None
 
+
+@functools.lru_cache(maxsize=64)
 def get_thumbnails_dir_for(directory: Path) -> Path:
-    """Get thumbnails directory for a media directory."""
+    """Get thumbnails directory for a media directory.
+    
+    Memoized: every thumbnail lookup goes through here, so the directory is
+    only created the first time it is seen. generate_thumbnails_for_directory
+    clears the cache, so a rescan recreates a deleted directory.
+    """
     thumb_dir = directory / ".thumbnails"
     thumb_dir.mkdir(exist_ok=True, parents=True)
     return thumb_dir
 
 
+@functools.lru_cache(maxsize=64)
 def get_large_thumbnails_dir_for(directory: Path) -> Path:
-    """Get large thumbnails directory for a media directory."""
+    """Get large thumbnails directory for a media directory (memoized, as above)."""
     thumb_dir = directory / ".thumbnails_large"
     thumb_dir.mkdir(exist_ok=True, parents=True)
     return thumb_dir
@@ -52,35 +79,130 @@ def generate_thumbnail_for_image(image_path: Path, output_path: Path, height: in
     """
     state = get_state()
     try:
-        if Image is None:
+        if pyvips is None and Image is None:
             state.logger.warning("PIL not available, cannot generate image thumbnails")
             return False
         
         if height is None:
             height = state.settings.thumbnail_height
         
+        if pyvips is not None:
+            _vips_thumbnail(image_path, output_path, height)
+            return True
+        
         with Image.open(image_path) as img:
-            # Calculate width to maintain aspect ratio
-            aspect_ratio = img.width / img.height
-            width = int(height * aspect_ratio)
-            
-            # Resize image
-            img.thumbnail((width, height), Image.Resampling.LANCZOS)
-            
-            # Convert to RGB if needed (for RGBA images)
-            if img.mode in ('RGBA', 'P'):
-                rgb_img = Image.new('RGB', img.size, (255, 255, 255))
-                rgb_img.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
-                img = rgb_img
-            
-            # Save as JPEG
-            img.save(output_path, 'JPEG', quality=85, optimize=True)
+            _save_image_thumbnail(img, output_path, height)
             return True
     except Exception as e:
         state.logger.error(f"Failed to generate thumbnail for {image_path}: {e}")
         return False
 
 
+def generate_thumbnail_for(media_path: Path, output_path: Path, height: int = None) -> bool:
+    """Generate a thumbnail for an image or video, picked by file extension.
+    
+    Returns False for files that are neither.
+    """
+    ext = media_extension(media_path.name)
+    if ext in IMAGE_EXTENSIONS:
+        return generate_thumbnail_for_image(media_path, output_path, height)
+    if ext in VIDEO_EXTENSIONS:
+        return generate_thumbnail_for_video(media_path, output_path, height)
+    return False
+
+
+def _save_image_thumbnail(img, output_path: Path, height: int) -> None:
+    """Resize an open image in place and save it as a JPEG thumbnail."""
+    # Calculate width to maintain aspect ratio
+    aspect_ratio = img.width / img.height
+    width = int(height * aspect_ratio)
+    
+    # Resize image
+    img.thumbnail((width, height), Image.Resampling.LANCZOS)
+    
+    # Convert to RGB if needed: RGBA is flattened onto white, using the
+    # image itself as the paste mask (its alpha band) rather than split()
+    if img.mode == 'RGBA':
+        rgb_img = Image.new('RGB', img.size, (255, 255, 255))
+        rgb_img.paste(img, mask=img)
+        img = rgb_img
+    elif img.mode == 'P':
+        img = img.convert('RGB')
+    
+    # Save as JPEG
+    img.save(output_path, 'JPEG', quality=85, optimize=True)
+
+
+# Width bound passed to libvips so that only the target height constrains it
+_VIPS_MAX_WIDTH = 100_000
+
+
+def _vips_thumbnail(image_path: Path, output_path: Path, height: int) -> None:
+    """Write a JPEG thumbnail with libvips, flattening alpha onto white.
+    
+    libvips shrinks while decoding (e.g. JPEG DCT scaling), so the full
+    image is never held in memory. Like Pillow's thumbnail(), images are
+    never enlarged.
+    """
+    thumb = pyvips.Image.thumbnail(str(image_path), _VIPS_MAX_WIDTH, height=height, size="down")
+    if thumb.hasalpha():
+        thumb = thumb.flatten(background=[255, 255, 255])
+    thumb.write_to_file(str(output_path), Q=85, optimize_coding=True, strip=True)
+
+
+# Long-lived worker processes for decoding and resizing images, so a large
+# directory uses every core instead of one.
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """Get the shared image thumbnail process pool, starting it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = new_process_pool()
+    return _pool
+
+
+def _discard_pool(broken: ProcessPoolExecutor) -> None:
+    """Drop a pool that lost a worker, so the next run starts a new one.
+    
+    A ProcessPoolExecutor whose worker dies (e.g. a decoder crash on a bad
+    image) stays broken for good; without this no image would get a
+    thumbnail again until the server restarts.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is broken:
+            _pool = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def _image_thumbnails_job(image_path: str, targets: List[Tuple[str, int]]) -> Optional[str]:
+    """Render every missing thumbnail of one image inside a pool worker.
+    
+    The image is decoded once for all sizes. Returns an error message, or
+    None on success; logging is left to the parent process.
+    """
+    try:
+        if pyvips is not None:
+            # libvips shrinks on load, so each size is cheapest straight from the file
+            for output_path, height in targets:
+                _vips_thumbnail(Path(image_path), Path(output_path), height)
+            return None
+        with Image.open(image_path) as img:
+            img.load()
+            last = len(targets) - 1
+            for i, (output_path, height) in enumerate(targets):
+                # thumbnail() works in place, so all but the last size get a copy
+                _save_image_thumbnail(img if i == last else img.copy(), Path(output_path), height)
+        return None
+    except Exception as e:
+        return str(e)
+
+
 def generate_thumbnail_for_video(video_path: Path, output_path: Path, height: int = None) -> bool:
     """Generate thumbnail for a video file by extracting first frame.
     
@@ -115,23 +237,104 @@ def generate_thumbnail_for_video(video_path: Path, output_path: Path, height: in
         return False
 
 
-def generate_thumbnails_for_directory(directory: Path, file_list: List[Path]) -> None:
+# Videos per ffmpeg call when generating a directory's thumbnails; one
+# process start and filter graph setup is shared by the whole batch.
+_VIDEO_BATCH_SIZE = 8
+
+
+def _video_batch_command(batch: List[Tuple[Path, List[Tuple[Path, int]]]]) -> List[str]:
+    """Build one ffmpeg command that writes every thumbnail of a batch.
+    
+    Each input's first frame is decoded once and split into one scaled
+    output per missing thumbnail size.
+    """
+    cmd = ["ffmpeg", "-y"]
+    for video_path, _ in batch:
+        cmd += ["-i", str(video_path)]
+    
+    graph = []
+    outputs = []
+    for i, (_, targets) in enumerate(batch):
+        labels = [f"s{i}_{j}" for j in range(len(targets))]
+        split = f",split={len(targets)}" if len(targets) > 1 else ""
+        graph.append(f"[{i}:v]trim=end_frame=1{split}" + "".join(f"[{label}]" for label in labels))
+        for label, (output_path, height) in zip(labels, targets):
+            graph.append(f"[{label}]scale=-1:{height}[{label}o]")
+            outputs += ["-map", f"[{label}o]", "-frames:v", "1", "-q:v", "2", str(output_path)]
+    
+    return cmd + ["-filter_complex", ";".join(graph)] + outputs
+
+
+def _video_batch_job(batch: List[Tuple[Path, List[Tuple[Path, int]]]]) -> List[Optional[str]]:
+    """Render the missing thumbnails of several videos with one ffmpeg call.
+    
+    If the batched call fails (one unreadable file fails the whole graph),
+    each video is retried on its own. Returns one error or None per video.
+    """
+    state = get_state()
+    if len(batch) > 1:
+        try:
+            result = subprocess.run(
+                _video_batch_command(batch), capture_output=True, text=True,
+                timeout=30 * len(batch)
+            )
+            if result.returncode == 0:
+                return [None] * len(batch)
+            state.logger.info(f"Batched ffmpeg failed for {len(batch)} videos, retrying one at a time")
+        except subprocess.TimeoutExpired:
+            state.logger.info(f"Batched ffmpeg timed out for {len(batch)} videos, retrying one at a time")
+        except Exception as e:
+            state.logger.info(f"Batched ffmpeg failed ({e}), retrying one at a time")
+    
+    errors = []
+    for video_path, targets in batch:
+        error = None
+        for output_path, height in targets:
+            # generate_thumbnail_for_video logs the ffmpeg error itself
+            if not generate_thumbnail_for_video(video_path, output_path, height):
+                error = "ffmpeg failed"
+                break
+        errors.append(error)
+    return errors
+
+
+def generate_thumbnails_for_directory(directory: Path, file_list: List[Path],
+                                      cancel: Optional[threading.Event] = None) -> None:
     """Generate thumbnails for all media files in the directory.
-    Generates both regular and large thumbnails."""
+    Generates both regular and large thumbnails.
+    
+    Images are resized in a process pool and videos are batched into
+    ffmpeg calls run at most one per core, so files are processed in
+    parallel and progress counts them as they finish. Setting cancel stops
+    the run: queued work is dropped and only jobs already running finish.
+    """
     state = get_state()
     
     if not state.settings.generate_thumbnails:
         return
     
+    # Recheck the thumbnail directories once per run, in case they were removed
+    get_thumbnails_dir_for.cache_clear()
+    get_large_thumbnails_dir_for.cache_clear()
+    
     # Initialize progress tracking - check for both regular and large thumbnails
-    files_needing_thumbnails = []
+    sizes = (
+        (False, state.settings.thumbnail_height),
+        (True, state.settings.large_thumbnail_height),
+    )
+    pending = []
     for media_file in file_list:
-        thumb_path = get_thumbnail_path_for(media_file, large=False)
-        large_thumb_path = get_thumbnail_path_for(media_file, large=True)
-        if not thumb_path.exists() or not large_thumb_path.exists():
-            files_needing_thumbnails.append(media_file)
+        if cancel is not None and cancel.is_set():
+            return
+        targets = []
+        for large, height in sizes:
+            thumb_path = get_thumbnail_path_for(media_file, large=large)
+            if not thumb_path.exists():
+                targets.append((thumb_path, height))
+        if targets:
+            pending.append((media_file, targets))
     
-    total_files = len(files_needing_thumbnails)
+    total_files = len(pending)
     if total_files == 0:
         state.logger.info("All thumbnails already exist, no generation needed")
         return
@@ -147,57 +350,65 @@ def generate_thumbnails_for_directory(directory: Path, file_list: List[Path]) ->
     generated = 0
     
     try:
-        for i, media_file in enumerate(files_needing_thumbnails):
-            # Update progress
-            state.thumbnail_progress.update({
-                "current": i + 1,
-                "current_file": media_file.name
-            })
-            
-            thumb_path = get_thumbnail_path_for(media_file, large=False)
-            large_thumb_path = get_thumbnail_path_for(media_file, large=True)
+        with ThreadPoolExecutor(max_workers=process_pool_workers()) as ffmpeg_pool:
+            futures = {}
+            image_pools = {}
+            videos = []
+            for media_file, targets in pending:
+                ext = media_extension(media_file.name)
+                if ext in IMAGE_EXTENSIONS:
+                    if pyvips is None and Image is None:
+                        state.logger.warning("PIL not available, cannot generate image thumbnails")
+                        continue
+                    job = (str(media_file), [(str(path), height) for path, height in targets])
+                    pool = _get_pool()
+                    try:
+                        future = pool.submit(_image_thumbnails_job, *job)
+                    except BrokenProcessPool:
+                        # A worker died on an earlier image; carry on in a new pool
+                        _discard_pool(pool)
+                        pool = _get_pool()
+                        future = pool.submit(_image_thumbnails_job, *job)
+                    futures[future] = [media_file]
+                    image_pools[future] = pool
+                elif ext in VIDEO_EXTENSIONS:
+                    videos.append((media_file, targets))
             
-            # Generate thumbnails based on file type
-            success_regular = False
-            success_large = False
-            name_lower = media_file.name.lower()
+            for start in range(0, len(videos), _VIDEO_BATCH_SIZE):
+                batch = videos[start:start + _VIDEO_BATCH_SIZE]
+                future = ffmpeg_pool.submit(_video_batch_job, batch)
+                futures[future] = [media_file for media_file, _ in batch]
             
-            if name_lower.endswith(('.png', '.jpg', '.jpeg')):
-                # Generate regular thumbnail
-                if not thumb_path.exists():
-                    success_regular = generate_thumbnail_for_image(
-                        media_file, thumb_path, state.settings.thumbnail_height
-                    )
-                else:
-                    success_regular = True
-                    
-                # Generate large thumbnail
-                if not large_thumb_path.exists():
-                    success_large = generate_thumbnail_for_image(
-                        media_file, large_thumb_path, state.settings.large_thumbnail_height
-                    )
-                else:
-                    success_large = True
-                    
-            elif name_lower.endswith('.mp4'):
-                # Generate regular thumbnail
-                if not thumb_path.exists():
-                    success_regular = generate_thumbnail_for_video(
-                        media_file, thumb_path, state.settings.thumbnail_height
-                    )
-                else:
-                    success_regular = True
-                    
-                # Generate large thumbnail
-                if not large_thumb_path.exists():
-                    success_large = generate_thumbnail_for_video(
-                        media_file, large_thumb_path, state.settings.large_thumbnail_height
-                    )
-                else:
-                    success_large = True
-            
-            if success_regular and success_large:
-                generated += 1
+            completed = 0
+            for future in as_completed(futures):
+                if cancel is not None and cancel.is_set():
+                    for pending_future in futures:
+                        pending_future.cancel()
+                    state.logger.info("Thumbnail generation cancelled by a newer scan")
+                    break
+                media_files = futures[future]
+                completed += len(media_files)
+                # Update progress
+                state.thumbnail_progress.update({
+                    "current": completed,
+                    "current_file": media_files[-1].name
+                })
+                try:
+                    outcome = future.result()
+                except BrokenProcessPool as e:
+                    # Images still queued in the dead pool fail with it; the
+                    # next scan retries them in a new one
+                    _discard_pool(image_pools[future])
+                    outcome = str(e)
+                except Exception as e:
+                    outcome = str(e)
+                # Image jobs report one file, video batches a list
+                errors = outcome if isinstance(outcome, list) else [outcome] * len(media_files)
+                for media_file, error in zip(media_files, errors):
+                    if error is None:
+                        generated += 1
+                    else:
+                        state.logger.error(f"Failed to generate thumbnail for {media_file}: {error}")
                 
     finally:
         # Reset progress tracking
@@ -211,13 +422,59 @@ def generate_thumbnails_for_directory(directory: Path, file_list: List[Path]) ->
         state.logger.info(f"Thumbnail generation complete: {generated}/{total_files} generated")
 
 
+# One directory run at a time: starting a run cancels the previous one, and
+# the new run waits for it to wind down before starting its own work, so
+# rapid rescans don't pile up concurrent runs and ffmpeg processes.
+_run_lock = threading.Lock()
+_start_lock = threading.Lock()
+_current_cancel: Optional[threading.Event] = None
+
+
+def _run_thumbnail_generation(directory: Path, file_list: List[Path], cancel: threading.Event) -> None:
+    with _run_lock:
+        # Superseded while waiting for the previous run to finish
+        if cancel.is_set():
+            return
+        
+        # With several server workers each one scans at startup; an flock on
+        # the thumbnail directory lets only one of them generate its thumbnails
+        lock_file = None
+        if fcntl is not None:
+            try:
+                lock_file = open(get_thumbnails_dir_for(directory) / ".generating.lock", "w")
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                lock_file.close()
+                get_state().logger.info(f"Thumbnails for {directory} are being generated by another process")
+                return
+            except OSError:
+                # Read-only directory or no flock support: run unguarded
+                if lock_file is not None:
+                    lock_file.close()
+                lock_file = None
+        try:
+            generate_thumbnails_for_directory(directory, file_list, cancel)
+        finally:
+            if lock_file is not None:
+                lock_file.close()  # releases the flock
+
+
 def start_thumbnail_generation(directory: Path, file_list: List[Path]) -> None:
-    """Start thumbnail generation in a background thread."""
+    """Start thumbnail generation in a background thread.
+    
+    Any run still in progress for an earlier scan is cancelled.
+    """
+    global _current_cancel
     state = get_state()
     if state.settings.generate_thumbnails:
+        cancel = threading.Event()
+        with _start_lock:
+            if _current_cancel is not None:
+                _current_cancel.set()
+            _current_cancel = cancel
         thumbnail_thread = threading.Thread(
-            target=generate_thumbnails_for_directory, 
-            args=(directory, file_list),
+            target=_run_thumbnail_generation, 
+            args=(directory, file_list, cancel),
             daemon=True
         )
-        thumbnail_thread.start()
\ No newline at end of file
+        thumbnail_thread.start()
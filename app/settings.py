@@ -34,6 +34,9 @@ class Settings(BaseModel):
     # Server settings
     host: str = Field(default="127.0.0.1", description="Host to bind")
     port: int = Field(default=7862, description="Port to serve")
+    access_log: bool = Field(default=False, description="Log every HTTP request (uvicorn access log)")
+    sendfile_header: Optional[str] = Field(default=None, description="Let a front proxy send media files: X-Accel-Redirect (nginx) or X-Sendfile (Apache)")
+    accel_redirect_prefix: str = Field(default="/_internal_media", description="nginx internal location that maps onto the filesystem root (X-Accel-Redirect only)")
     
     # UI settings
     style: str = Field(default="style_default.css", description="CSS style file from themes folder")
@@ -82,6 +85,17 @@ class Settings(BaseModel):
     
 
     
+    @field_validator('sendfile_header')
+    @classmethod
+    def validate_sendfile_header(cls, v):
+        """Validate and normalize the front proxy sendfile header."""
+        if v is None:
+            return v
+        for header in ("X-Accel-Redirect", "X-Sendfile"):
+            if v.lower() == header.lower():
+                return header
+        raise ValueError(f"sendfile_header must be X-Accel-Redirect or X-Sendfile, got {v}")
+    
     @field_validator('thumbnail_height')
     @classmethod
     def validate_thumbnail_height(cls, v):
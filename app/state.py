@@ -1,6 +1,8 @@
 """Global application state management."""
 
 import logging
+import threading
+import time
 from pathlib import Path
 from typing import List, Dict, Optional
 
@@ -16,7 +18,15 @@ class ApplicationState:
         self.settings = settings
         self.video_dir: Path = settings.dir
         self.file_list: List[Path] = []
+        self.file_index: Dict[str, Path] = {}
         self.file_pattern: str = settings.pattern
+        # Media directory mtime when file_list was discovered (None if unknown)
+        self.scan_mtime_ns: Optional[int] = None
+        # Bumped whenever the file listing or a score changes; combined with
+        # the start time so versions from a previous process never match.
+        self.listing_epoch: str = f"{time.time_ns():x}"
+        self.listing_version: int = 0
+        self._listing_version_lock = threading.Lock()
         self.logger: logging.Logger = logging.getLogger("video_scorer_fastapi")
         
         # Initialize database if enabled
@@ -49,6 +59,23 @@ class ApplicationState:
         if pattern:
             self.file_pattern = pattern
         
+    def set_file_list(self, file_list: List[Path]):
+        """Replace the discovered file list and its name -> Path index."""
+        self.file_list = file_list
+        # By bare name, as the listing names files; like a scan of the list,
+        # the first file wins when a recursive pattern finds a name twice
+        file_index: Dict[str, Path] = {}
+        for p in file_list:
+            file_index.setdefault(p.name, p)
+        self.file_index = file_index
+        self.bump_listing_version()
+        
+    def bump_listing_version(self) -> int:
+        """Mark the media listing as changed and return the new version."""
+        with self._listing_version_lock:
+            self.listing_version += 1
+            return self.listing_version
+        
     def get_scores_dir(self) -> Path:
         """Get the scores directory for current video directory."""
         return self.video_dir / ".scores"
@@ -37,6 +37,12 @@ document.addEventListener('DOMContentLoaded', function() {
 
 let videos = [];
 let filtered = [];
+// name -> item lookup over `videos`, rebuilt lazily whenever the array is
+// replaced or grows (it is reassigned in several places, including
+// search-toolbar.js), so score updates don't scan the whole list.
+let videoIndex = new Map();
+let videoIndexSource = null;
+let videoIndexLength = 0;
 let idx = 0;
 let currentDir = "";
 let currentPattern = "*.mp4";
@@ -458,87 +464,37 @@ function updateThumbnailToggleButton(){
   icon.innerHTML = svgThumbnail();
   icon.title = showThumbnails ? 'Hide thumbnails' : 'Show thumbnails';
 }
+const SCOREBAR_BTN_STYLE = "background:none; border:none; padding:0; cursor:pointer;";
+
+// Rating strip markup (reject, clear and five stars) only depends on the
+// score, so build it once per possible score instead of on every render.
+function buildScoreStrip(score){
+  const stars = (score === -1) ? 0 : Math.max(0, score||0);
+  const starButtons = [1, 2, 3, 4, 5].map(n =>
+    `<button id="scorebar-star-${n}" class="scorebar-icon-btn" data-star="${n}" title="Rate ${n} star${n > 1 ? 's' : ''}" style="${SCOREBAR_BTN_STYLE}">${svgStar(n <= stars)}</button>`
+  ).join('');
+  // Reject icon, clear button (vertical pipe), then the clickable stars
+  return `<button id="scorebar-reject" class="scorebar-icon-btn" title="Reject media" style="${SCOREBAR_BTN_STYLE}">${svgReject(score === -1)}</button>`
+    + `<button id="scorebar-clear" class="scorebar-icon-btn" title="Clear score (no rating)" style="${SCOREBAR_BTN_STYLE}">${svgClear(score === 0)}</button>`
+    + starButtons;
+}
+const SCORE_STRIP_HTML = new Map([-1, 0, 1, 2, 3, 4, 5].map(s => [s, buildScoreStrip(s)]));
+
 function renderScoreBar(score, favourite){
   const bar = document.getElementById("scorebar");
-  let html = `<div style="display:flex; gap:8px; align-items:center; justify-content:space-between;">`;
-  html += `<div style="display:flex; gap:8px; align-items:center;">`;
-  
-  // Make reject icon clickable
-  html += `<button id="scorebar-reject" class="scorebar-icon-btn" title="Reject media" style="background:none; border:none; padding:0; cursor:pointer;">`;
-  html += svgReject(score === -1);
-  html += `</button>`;
-  
-  // Add clear button (vertical pipe)
-  html += `<button id="scorebar-clear" class="scorebar-icon-btn" title="Clear score (no rating)" style="background:none; border:none; padding:0; cursor:pointer;">`;
-  html += svgClear(score === 0);
-  html += `</button>`;
-  
-  // Make star icons clickable  
-  const stars = (score === -1) ? 0 : Math.max(0, score||0);
-  for (let i=0;i<5;i++) {
-    html += `<button id="scorebar-star-${i+1}" class="scorebar-icon-btn" data-star="${i+1}" title="Rate ${i+1} star${i > 0 ? 's' : ''}" style="background:none; border:none; padding:0; cursor:pointer;">`;
-    html += svgStar(i<stars);
-    html += `</button>`;
-  }
-  
-  html += `</div>`;
-  html += `<div style="display:flex; gap:8px; align-items:center;">`;
-  // Add favourite toggle
-  html += `<button id="scorebar-favourite" class="scorebar-icon-btn" title="${favourite ? 'Remove from favourites' : 'Add to favourites'}" style="background:none; border:none; padding:0; cursor:pointer;">`;
-  html += svgHeart(favourite);
-  html += `</button>`;
-  html += `<button id="media-download-btn" class="maximize-btn" title="Download current media" disabled>`;
-  html += svgDownload();
-  html += `</button>`;
-  html += `<button id="maximize-btn" class="maximize-btn" title="${isMaximized ? 'Return to actual size' : 'Maximize media'}">`;
-  html += isMaximized ? svgMinimize() : svgMaximize();
-  html += `</button>`;
-  html += `</div>`;
-  html += `</div>`;
+  const html = `<div style="display:flex; gap:8px; align-items:center; justify-content:space-between;">
+<div style="display:flex; gap:8px; align-items:center;">${SCORE_STRIP_HTML.get(score) || buildScoreStrip(score)}</div>
+<div style="display:flex; gap:8px; align-items:center;">
+<button id="scorebar-favourite" class="scorebar-icon-btn" data-favourite="${favourite ? 'true' : 'false'}" title="${favourite ? 'Remove from favourites' : 'Add to favourites'}" style="${SCOREBAR_BTN_STYLE}">${svgHeart(favourite)}</button>
+<button id="media-download-btn" class="maximize-btn" title="Download current media" disabled>${svgDownload()}</button>
+<button id="maximize-btn" class="maximize-btn" title="${isMaximized ? 'Return to actual size' : 'Maximize media'}">${isMaximized ? svgMinimize() : svgMaximize()}</button>
+</div>
+</div>`;
   bar.innerHTML = html;
   
   // Update mobile score bar
   updateMobileScoreBar(score);
-  
-  // Attach event listeners to the new buttons
-  const maximizeBtn = document.getElementById('maximize-btn');
-  if (maximizeBtn) {
-    maximizeBtn.addEventListener('click', toggleMaximize);
-  }
-  
-  // Attach event listener to clickable reject icon
-  const rejectBtn = document.getElementById('scorebar-reject');
-  if (rejectBtn) {
-    rejectBtn.addEventListener('click', () => {
-      postScore(-1);
-    });
-  }
-  
-  // Attach event listener to clickable clear icon
-  const clearBtn = document.getElementById('scorebar-clear');
-  if (clearBtn) {
-    clearBtn.addEventListener('click', () => {
-      postScore(0);
-    });
-  }
-  
-  // Attach event listeners to clickable star icons
-  for (let i = 1; i <= 5; i++) {
-    const starBtn = document.getElementById(`scorebar-star-${i}`);
-    if (starBtn) {
-      starBtn.addEventListener('click', () => {
-        postScore(i);
-      });
-    }
-  }
-  
-  // Attach event listener to favourite toggle
-  const favouriteBtn = document.getElementById('scorebar-favourite');
-  if (favouriteBtn) {
-    favouriteBtn.addEventListener('click', () => {
-      postFavourite(!favourite);
-    });
-  }
+  // Clicks are handled by the delegated listener on #scorebar
 }
 
 // Mobile Score Bar Functions
@@ -1096,18 +1052,15 @@ function renderSidebar(){
     setTimeout(() => window.ViewportLoader.observeAll(), 0);
   }
 }
+function passesMinFilter(v){
+  if (minFilter === null) return true;
+  if (minFilter === 'rejected') return v.score === -1;
+  if (minFilter === 'unrated') return !v.score || v.score === 0;
+  if (minFilter === 'unrated_and_above') return !v.score || v.score >= 0;
+  return (v.score||0) >= minFilter;
+}
 function applyFilter(){
-  if (minFilter === null) {
-    filtered = videos.slice();
-  } else if (minFilter === 'rejected') {
-    filtered = videos.filter(v => v.score === -1);
-  } else if (minFilter === 'unrated') {
-    filtered = videos.filter(v => !v.score || v.score === 0);
-  } else if (minFilter === 'unrated_and_above') {
-    filtered = videos.filter(v => !v.score || v.score >= 0);
-  } else {
-    filtered = videos.filter(v => (v.score||0) >= minFilter);
-  }
+  filtered = minFilter === null ? videos.slice() : videos.filter(passesMinFilter);
   const info = document.getElementById('filter_info');
   let label;
   if (minFilter === null) {
@@ -1251,8 +1204,7 @@ function show(i){
     }
   };
   
-  fetch('/api/meta/' + encodeURIComponent(v.name))
-    .then(r => r.ok ? r.json() : null)
+  fetchMeta(v.name)
     .then(meta => {
       if (meta && meta.width && meta.height) {
         // Insert resolution before clipboard icon
@@ -1265,6 +1217,48 @@ function show(i){
   renderScoreBar(v.score || 0, v.favourite || false);
   updateMediaDownloadButton(v.name);
   renderSidebar();
+  prefetchNeighbourMeta(idx);
+}
+
+// Metadata for recently shown and neighbouring items, so stepping through
+// files doesn't wait on /api/meta (ffprobe / PNG parsing) for each one.
+const META_CACHE_MAX = 200;
+const META_PREFETCH_RADIUS = 3;
+const metaCache = new Map();
+
+function fetchMeta(name){
+  const key = currentDir + '/' + name;
+  let pending = metaCache.get(key);
+  if (pending) {
+    // Refresh recency so the entry survives eviction
+    metaCache.delete(key);
+    metaCache.set(key, pending);
+    return pending;
+  }
+  pending = fetch('/api/meta/' + encodeURIComponent(name))
+    .then(r => r.ok ? r.json() : null)
+    .then(meta => {
+      if (meta === null) metaCache.delete(key);
+      return meta;
+    })
+    .catch(err => {
+      metaCache.delete(key);
+      throw err;
+    });
+  metaCache.set(key, pending);
+  while (metaCache.size > META_CACHE_MAX) {
+    metaCache.delete(metaCache.keys().next().value);
+  }
+  return pending;
+}
+function prefetchNeighbourMeta(center){
+  for (let d = 1; d <= META_PREFETCH_RADIUS; d++) {
+    for (const j of [center + d, center - d]) {
+      if (j >= 0 && j < filtered.length) {
+        fetchMeta(filtered[j].name).catch(() => {});
+      }
+    }
+  }
 }
 // Function to estimate text width
 function estimateTextWidth(text, element) {
@@ -1325,6 +1319,15 @@ function resizeDirectoryInput() {
   }
 }
 
+function findVideo(name){
+  if (videoIndexSource !== videos || videoIndexLength !== videos.length) {
+    videoIndex = new Map(videos.map(x => [x.name, x]));
+    videoIndexSource = videos;
+    videoIndexLength = videos.length;
+  }
+  return videoIndex.get(name);
+}
+
 async function loadVideos(){
   const res = await fetch("/api/videos");
   const data = await res.json();
@@ -1760,46 +1763,94 @@ function showNotification(message, type = 'info') {
   }
 }
 
+// Score changes are applied locally right away and sent to the server in
+// batches, so rating several files in quick succession costs one request.
+const SCORE_FLUSH_MS = 100;
+let pendingScores = new Map(); // name -> { score, previous }
+let scoreFlushTimer = null;
+
+function applyLocalScore(name, score){
+  const source = findVideo(name);
+  if (source) source.score = score;
+  const cur = filtered[idx];
+  const item = (cur && cur.name === name) ? cur : filtered.find(x => x.name === name);
+  if (item) item.score = score;
+  const curName = cur ? cur.name : null;
+  // Rating while the item stays in view (the common case) doesn't change
+  // the filtered list, so only refilter when it enters or leaves the view.
+  if (!item || !passesMinFilter(item)) applyFilter();
+  const newIndex = curName === null ? -1 : filtered.findIndex(x => x.name === curName);
+  const v = filtered[newIndex];
+  if (v && newIndex === idx) {
+    // Still on the same item: only the score widgets changed, so skip
+    // reloading the media and metadata that show() would do.
+    renderScoreBar(v.score || 0, v.favourite || false);
+    renderSidebar();
+  } else {
+    // show() re-renders the score bar and sidebar itself
+    show(newIndex >= 0 ? newIndex : idx);
+  }
+}
+
 async function postScore(score){
   const v = filtered[idx];
   if (!v) return;
   
+  // Keep the score from before the first unsent change, to revert to on failure
+  const pending = pendingScores.get(v.name);
+  const previous = pending ? pending.previous : (v.score || 0);
+  pendingScores.set(v.name, { score: score, previous: previous });
+  applyLocalScore(v.name, score);
+  
+  if (scoreFlushTimer !== null) clearTimeout(scoreFlushTimer);
+  scoreFlushTimer = setTimeout(flushScores, SCORE_FLUSH_MS);
+}
+
+async function flushScores(){
+  if (scoreFlushTimer !== null) {
+    clearTimeout(scoreFlushTimer);
+    scoreFlushTimer = null;
+  }
+  if (pendingScores.size === 0) return;
+  const batch = pendingScores;
+  pendingScores = new Map();
+  
+  let failed = [];
   try {
-    const response = await fetch('/api/score', {
+    const response = await fetch('/api/scores', {
       method: 'POST',
       headers: {'Content-Type':'application/json'},
-      body: JSON.stringify({ name: v.name, score: score })
+      body: JSON.stringify({
+        scores: Array.from(batch, ([name, p]) => ({ name: name, score: p.score }))
+      }),
+      keepalive: true
     });
     
     if (!response.ok) {
-      console.error('Failed to update score:', response.status, response.statusText);
-      return; // Don't update local state if API call failed
-    }
-    
-    const result = await response.json();
-    if (!result.ok) {
-      console.error('Score update failed:', result);
-      return; // Don't update local state if API returned error
-    }
-    
-    // Only update local state if API call succeeded
-    const source = videos.find(x => x.name === v.name);
-    if (source) source.score = score;
-    v.score = score;
-    const curName = v.name;
-    applyFilter();
-    const newIndex = filtered.findIndex(x => x.name === curName);
-    if (newIndex >= 0) {
-      show(newIndex);
+      console.error('Failed to update scores:', response.status, response.statusText);
+      failed = Array.from(batch.keys());
     } else {
-      show(idx);
+      const result = await response.json();
+      if (!result.ok) {
+        console.error('Score update failed:', result);
+        failed = (result.results || []).filter(r => !r.ok).map(r => r.name);
+      }
     }
-    renderSidebar();
   } catch (error) {
-    console.error('Network error updating score:', error);
+    console.error('Network error updating scores:', error);
+    failed = Array.from(batch.keys());
+  }
+  
+  // Revert local state for scores the server did not store, unless the
+  // user has changed them again since
+  for (const name of failed) {
+    const p = batch.get(name);
+    if (p && !pendingScores.has(name)) applyLocalScore(name, p.previous);
   }
 }
 
+window.addEventListener('pagehide', flushScores);
+
 async function postFavourite(favourite){
   const v = filtered[idx];
   if (!v) return;
@@ -1823,7 +1874,7 @@ async function postFavourite(favourite){
     }
     
     // Only update local state if API call succeeded
-    const source = videos.find(x => x.name === v.name);
+    const source = findVideo(v.name);
     if (source) source.favourite = favourite;
     v.favourite = favourite;
     
@@ -1861,7 +1912,7 @@ async function updateNsfwStatus(filename, nsfw) {
     }
     
     // Update local state if API call succeeded
-    const source = videos.find(x => x.name === filename);
+    const source = findVideo(filename);
     if (source) source.nsfw = nsfw;
     const v = filtered[idx];
     if (v && v.name === filename) {
@@ -1877,15 +1928,47 @@ async function updateNsfwStatus(filename, nsfw) {
   }
 }
 
+// Key presses are buffered and sent to the server in batches, so fast
+// rating doesn't cost one request (and one log write) per key.
+const KEY_LOG_FLUSH_MS = 500;
+let keyLogBuffer = [];
+let keyLogTimer = null;
+
+function queueKeyLog(key, name){
+  keyLogBuffer.push({ key: key, name: name });
+  if (keyLogTimer === null) {
+    keyLogTimer = setTimeout(flushKeyLog, KEY_LOG_FLUSH_MS);
+  }
+}
+async function flushKeyLog(){
+  if (keyLogTimer !== null) {
+    clearTimeout(keyLogTimer);
+    keyLogTimer = null;
+  }
+  if (keyLogBuffer.length === 0) return;
+  const keys = keyLogBuffer;
+  keyLogBuffer = [];
+  try {
+    await fetch("/api/key", {
+      method: "POST",
+      headers: {"Content-Type":"application/json"},
+      body: JSON.stringify({ keys: keys }),
+      keepalive: true
+    });
+  } catch (error) {
+    console.error('Failed to send key log:', error);
+  }
+}
+// Send the last keys even if the page is closed before the timer fires
+window.addEventListener('pagehide', flushKeyLog);
 async function postKey(key){
   const v = filtered[idx];
-  await fetch("/api/key", {
-    method: "POST",
-    headers: {"Content-Type":"application/json"},
-    body: JSON.stringify({ key: key, name: v ? v.name : "" })
-  });
+  queueKeyLog(key, v ? v.name : "");
 }
 async function scanDir(path){
+  // Buffered scores and keys refer to files in the current directory, so
+  // send them before the scan switches the server to another one
+  await Promise.all([flushScores(), flushKeyLog()]);
   const pattern = (document.getElementById('pattern')?.value || '').trim();
   const res = await fetch("/api/scan", {
     method: "POST",
@@ -1956,7 +2039,7 @@ document.getElementById('min_filter').addEventListener('change', () => {
     minFilter = parseInt(val);
   }
   
-  fetch('/api/key', {method:'POST', headers:{'Content-Type':'application/json'}, body: JSON.stringify({ key: 'Filter=' + (minFilter===null?'none':(typeof minFilter === 'string'?minFilter:('>='+minFilter))), name: '' })});
+  queueKeyLog('Filter=' + (minFilter===null?'none':(typeof minFilter === 'string'?minFilter:('>='+minFilter))), '');
   applyFilter(); renderSidebar(); show(0);
 });
 document.getElementById('dir').addEventListener('keydown', (e) => {
@@ -2144,27 +2227,52 @@ if (rejectBtn) rejectBtn.addEventListener("click", () => { postScore(-1); });
 
 const clearBtn = document.getElementById("clear");
 if (clearBtn) clearBtn.addEventListener("click", () => { postScore(0); });
-document.querySelectorAll("[data-star]").forEach(btn => {
-  btn.addEventListener("click", () => {
-    const n = parseInt(btn.getAttribute("data-star"));
-    postScore(n);
-  });
+// The score bar is re-rendered on every show(), so its buttons share one
+// delegated listener instead of getting new listeners each time.
+const scoreBarEl = document.getElementById("scorebar");
+if (scoreBarEl) scoreBarEl.addEventListener("click", (e) => {
+  const btn = e.target.closest("button");
+  if (!btn || !scoreBarEl.contains(btn)) return;
+  if (btn.dataset.star) { postScore(parseInt(btn.dataset.star, 10)); return; }
+  switch (btn.id) {
+    case "scorebar-reject": postScore(-1); break;
+    case "scorebar-clear": postScore(0); break;
+    case "scorebar-favourite": postFavourite(btn.dataset.favourite !== "true"); break;
+    case "maximize-btn": toggleMaximize(); break;
+  }
 });
+function togglePlay(){
+  const player = document.getElementById("player");
+  if (!player || player.style.display==='none') return;
+  if (player.paused) { player.play(); } else { player.pause(); }
+}
+// Keyboard shortcuts: key -> [name logged with the key press, action].
+// Built once, so a keystroke is a single lookup.
+const KEY_ACTIONS = new Map([
+  ["Escape", ["Escape", () => toggleMaximize()]],
+  ["ArrowLeft", ["ArrowLeft", () => show(idx-1)]],
+  ["ArrowRight", ["ArrowRight", () => show(idx+1)]],
+  [" ", ["Space", togglePlay]],
+  ["1", ["1", () => postScore(1)]],
+  ["2", ["2", () => postScore(2)]],
+  ["3", ["3", () => postScore(3)]],
+  ["4", ["4", () => postScore(4)]],
+  ["5", ["5", () => postScore(5)]],
+  ["r", ["R", () => postScore(-1)]],
+  ["R", ["R", () => postScore(-1)]],
+  ["c", ["C", () => postScore(0)]],
+  ["C", ["C", () => postScore(0)]],
+]);
 document.addEventListener("keydown", (e) => {
+  const entry = KEY_ACTIONS.get(e.key);
+  if (!entry) return;
   if (["INPUT","TEXTAREA"].includes((e.target.tagName||"").toUpperCase())) return;
-  const player = document.getElementById("player");
-  function togglePlay(){ if (!player || player.style.display==='none') return; if (player.paused) { player.play(); } else { player.pause(); } }
-  if (e.key === "Escape" && isMaximized){ e.preventDefault(); postKey("Escape"); toggleMaximize(); return; }
-  if (e.key === "ArrowLeft"){ e.preventDefault(); postKey("ArrowLeft"); show(idx-1); return; }
-  if (e.key === "ArrowRight"){ e.preventDefault(); postKey("ArrowRight"); show(idx+1); return; }
-  if (e.key === " "){ e.preventDefault(); postKey("Space"); togglePlay(); return; }
-  if (e.key === "1"){ e.preventDefault(); postKey("1"); postScore(1); return; }
-  if (e.key === "2"){ e.preventDefault(); postKey("2"); postScore(2); return; }
-  if (e.key === "3"){ e.preventDefault(); postKey("3"); postScore(3); return; }
-  if (e.key === "4"){ e.preventDefault(); postKey("4"); postScore(4); return; }
-  if (e.key === "5"){ e.preventDefault(); postKey("5"); postScore(5); return; }
-  if (e.key === "r" || e.key === "R"){ e.preventDefault(); postKey("R"); postScore(-1); return; }
-  if (e.key === "c" || e.key === "C"){ e.preventDefault(); postKey("C"); postScore(0); return; }
+  const [logName, action] = entry;
+  // Escape only counts while maximized; otherwise leave it to the browser
+  if (e.key === "Escape" && !isMaximized) return;
+  e.preventDefault();
+  postKey(logName);
+  action();
 });
 async function extractCurrent(){
   if (!filtered.length) { alert("No item selected."); return; }
@@ -2185,24 +2293,51 @@ async function extractCurrent(){
     alert("Extraction failed: " + e);
   }
 }
+// Bulk extraction is sent in small batches, a few at a time, so progress
+// can be shown as batches finish and the server starts on the first files
+// while later ones are still being sent.
+const EXTRACT_BATCH_SIZE = 10;
+const EXTRACT_CONCURRENCY = 4;
+
 async function extractFiltered(){
   if (!filtered.length) { alert("No items in current filter scope."); return; }
   const names = filtered.map(v => v.name).filter(n => n.toLowerCase().endsWith('.mp4'));
   if (!names.length){ alert('No .mp4 files in the current filtered view.'); return; }
+  const batches = [];
+  for (let i = 0; i < names.length; i += EXTRACT_BATCH_SIZE) {
+    batches.push(names.slice(i, i + EXTRACT_BATCH_SIZE));
+  }
+  let ok = 0, err = 0, next = 0;
+  const report = () => showProgress(`Extracting... ${ok + err}/${names.length}`);
+  async function worker(){
+    while (next < batches.length) {
+      const batch = batches[next++];
+      try{
+        const res = await fetch("/api/extract", {
+          method: "POST",
+          headers: {"Content-Type":"application/json"},
+          body: JSON.stringify({ names: batch })
+        });
+        if (!res.ok) throw new Error(`HTTP ${res.status}`);
+        const data = await res.json();
+        const done = (data.results||[]).filter(r=>r.status==="ok").length;
+        ok += done;
+        err += batch.length - done;
+      }catch(e){
+        console.error('Extraction batch failed:', e);
+        err += batch.length;
+      }
+      report();
+    }
+  }
+  report();
   try{
-    const res = await fetch("/api/extract", {
-      method: "POST",
-      headers: {"Content-Type":"application/json"},
-      body: JSON.stringify({ names })
-    });
-    const data = await res.json();
-    const ok = (data.results||[]).filter(r=>r.status==="ok").length;
-    const err = (data.results||[]).length - ok;
-    postKey("ExtractFiltered");
-    alert(`Extracted: ${ok} OK, ${err} errors`);
-  }catch(e){
-    alert("Bulk extraction failed: " + e);
+    await Promise.all(Array.from({ length: Math.min(EXTRACT_CONCURRENCY, batches.length) }, worker));
+  } finally {
+    hideProgress();
   }
+  postKey("ExtractFiltered");
+  alert(`Extracted: ${ok} OK, ${err} errors`);
 }
 async function exportFiltered(){
   if (!filtered.length) { alert("No items in current filter scope."); return; }
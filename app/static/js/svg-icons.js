@@ -3,6 +3,8 @@
  * 
  * This file contains all SVG icon functions used throughout the app.
  * Icons are designed to work with CSS custom properties for theming.
+ * Two-state icons are built once per state and returned from a constant,
+ * since they are re-rendered on every navigation and rating change.
  */
 
 /**
@@ -10,7 +12,7 @@
  * @param {boolean} selected - Whether the reject state is active
  * @returns {string} SVG markup
  */
-function svgReject(selected) {
+function buildSvgReject(selected) {
   const circleFill = selected ? "var(--reject-fill-selected)" : "var(--reject-fill-unselected)";
   const xColor = selected ? "var(--reject-x-selected)" : "var(--reject-x-unselected)";
   const r = 16, cx = 20, cy = 20;
@@ -21,13 +23,17 @@ function svgReject(selected) {
   <line x1="${cx-10}" y1="${cy+10}" x2="${cx+10}" y2="${cy-10}" stroke="${xColor}" stroke-width="4" stroke-linecap="round" />
 </svg>`;
 }
+const SVG_REJECT_MARKUP = [buildSvgReject(false), buildSvgReject(true)];
+function svgReject(selected) {
+  return SVG_REJECT_MARKUP[selected ? 1 : 0];
+}
 
 /**
  * Star rating icon
  * @param {boolean} filled - Whether the star should be filled/selected
  * @returns {string} SVG markup
  */
-function svgStar(filled) {
+function buildSvgStar(filled) {
   const fill = filled ? "var(--star-fill-selected)" : "var(--star-fill-unselected)";
   return `
 <svg width="40" height="40" viewBox="0 0 40 40">
@@ -35,19 +41,27 @@ function svgStar(filled) {
     fill="${fill}" stroke="var(--star-stroke-color)" stroke-width="2"/>
 </svg>`;
 }
+const SVG_STAR_MARKUP = [buildSvgStar(false), buildSvgStar(true)];
+function svgStar(filled) {
+  return SVG_STAR_MARKUP[filled ? 1 : 0];
+}
 
 /**
  * Clear button icon - vertical pipe
  * @param {boolean} selected - Whether the clear state is active
  * @returns {string} SVG markup
  */
-function svgClear(selected) {
+function buildSvgClear(selected) {
   const lineColor = selected ? "var(--star-fill-selected)" : "var(--star-stroke-color)";
   return `
 <svg width="20" height="40" viewBox="0 0 20 40">
   <line x1="10" y1="8" x2="10" y2="32" stroke="${lineColor}" stroke-width="6" stroke-linecap="round"/>
 </svg>`;
 }
+const SVG_CLEAR_MARKUP = [buildSvgClear(false), buildSvgClear(true)];
+function svgClear(selected) {
+  return SVG_CLEAR_MARKUP[selected ? 1 : 0];
+}
 
 /**
  * Maximize media icon - expand corners
@@ -202,7 +216,7 @@ function svgMenu() {
  * @param {boolean} filled - Whether the heart should be filled
  * @returns {string} SVG markup
  */
-function svgHeart(filled) {
+function buildSvgHeart(filled) {
   const fill = filled ? "#ff69b4" : "none";  // Hot pink when filled, empty when not
   const stroke = filled ? "#ff69b4" : "var(--star-stroke-color)";  // Pink stroke when filled, theme stroke when empty
   return `
@@ -211,6 +225,10 @@ function svgHeart(filled) {
     fill="${fill}" stroke="${stroke}" stroke-width="2"/>
 </svg>`;
 }
+const SVG_HEART_MARKUP = [buildSvgHeart(false), buildSvgHeart(true)];
+function svgHeart(filled) {
+  return SVG_HEART_MARKUP[filled ? 1 : 0];
+}
 
 /**
  * Small heart icon for indicators in sidebar and tileview
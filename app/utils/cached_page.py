@@ -0,0 +1,69 @@
+"""Render-once HTML pages with ETag and pre-compressed gzip bodies."""
+
+import gzip
+import hashlib
+from typing import Any, Dict, Hashable, NamedTuple
+
+from fastapi import Request
+from fastapi.responses import Response
+from fastapi.templating import Jinja2Templates
+
+
+class RenderedPage(NamedTuple):
+    body: bytes
+    body_gz: bytes
+    etag: str
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """Check whether an Accept-Encoding header allows gzip."""
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        if coding.strip().lower() == "gzip":
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+class CachedPage:
+    """A template page that is rendered, encoded and compressed once per key.
+
+    For pages whose context is fixed for the life of the process (theme,
+    feature flags), so every request after the first is a dict lookup and
+    repeat visits are answered with 304 Not Modified.
+    """
+
+    def __init__(self, templates: Jinja2Templates, name: str, max_age: int = 300):
+        self.templates = templates
+        self.name = name
+        self.max_age = max_age
+        self._pages: Dict[Hashable, RenderedPage] = {}
+
+    def render(self, key: Hashable, **context: Any) -> RenderedPage:
+        """Render the page for a key, caching the encoded payloads."""
+        page = self._pages.get(key)
+        if page is None:
+            body = self.templates.get_template(self.name).render(**context).encode("utf-8")
+            page = RenderedPage(
+                body=body,
+                body_gz=gzip.compress(body, compresslevel=9),
+                etag=f'"{hashlib.md5(body).hexdigest()}"',
+            )
+            self._pages[key] = page
+        return page
+
+    def response(self, request: Request, key: Hashable, **context: Any) -> Response:
+        """Serve the page for a key, as 304, gzip or plain HTML."""
+        page = self.render(key, **context)
+        headers = {
+            "ETag": page.etag,
+            "Cache-Control": f"public, max-age={self.max_age}",
+            "Vary": "Accept-Encoding",
+        }
+
+        if request.headers.get("if-none-match") == page.etag:
+            return Response(status_code=304, headers=headers)
+
+        if accepts_gzip(request.headers.get("accept-encoding", "")):
+            headers["Content-Encoding"] = "gzip"
+            return Response(content=page.body_gz, media_type="text/html", headers=headers)
+        return Response(content=page.body, media_type="text/html", headers=headers)
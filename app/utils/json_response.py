@@ -0,0 +1,44 @@
+"""Fast JSON encoding and decoding for API requests and responses."""
+
+import json
+from typing import Any, Union
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse that serializes with orjson when it is installed.
+
+    orjson's C encoder is several times faster than the stdlib json module,
+    which matters for large listings like /api/videos. Falls back to the
+    standard JSONResponse rendering otherwise.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def json_loads(data: Union[str, bytes]) -> Any:
+    """Parse JSON text or bytes, using orjson when it is installed.
+
+    Decode errors are json.JSONDecodeError either way (orjson's error
+    subclasses it), so callers can keep catching that.
+    """
+    if orjson is None:
+        return json.loads(data)
+    return orjson.loads(data)
+
+
+async def read_json(request: Request) -> Any:
+    """Parse a request body as JSON, using orjson when it is installed."""
+    if orjson is None:
+        return await request.json()
+    return orjson.loads(await request.body())
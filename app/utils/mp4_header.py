@@ -0,0 +1,117 @@
+"""Read basic video properties straight from MP4/MOV box headers."""
+
+import os
+import struct
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+_BOX_HEADER = struct.Struct(">I4s")
+_LARGE_SIZE = struct.Struct(">Q")
+_DIMENSIONS_16 = struct.Struct(">HH")
+_DIMENSIONS_FIXED = struct.Struct(">II")
+
+# Boxes read into memory are small; anything bigger is not a header we want
+_MAX_READ = 1 << 20
+
+
+def read_mp4_dimensions(path: Path) -> Optional[Tuple[int, int]]:
+    """Return (width, height) of the first video track, or None.
+
+    Walks moov -> trak and takes the coded size from the track's visual
+    sample entry (stsd), falling back to the tkhd presentation size. Only
+    box headers are read; media data is seeked over. Returns None for
+    anything it can't parse, so callers can fall back to ffprobe.
+    """
+    try:
+        with open(path, "rb") as f:
+            end = os.fstat(f.fileno()).st_size
+            for box_type, start, size in _iter_boxes(f, 0, end):
+                if box_type == b"moov":
+                    return _dimensions_from_moov(f, start, start + size)
+    except (OSError, struct.error, ValueError):
+        pass
+    return None
+
+
+def _iter_boxes(f: BinaryIO, offset: int, end: int) -> Iterator[Tuple[bytes, int, int]]:
+    """Yield (type, payload_offset, payload_size) for boxes in [offset, end)."""
+    while offset + 8 <= end:
+        f.seek(offset)
+        header = f.read(8)
+        if len(header) < 8:
+            return
+        size, box_type = _BOX_HEADER.unpack(header)
+        header_size = 8
+        if size == 1:
+            large = f.read(8)
+            if len(large) < 8:
+                return
+            size = _LARGE_SIZE.unpack(large)[0]
+            header_size = 16
+        elif size == 0:
+            size = end - offset  # box extends to the end of its container
+        if size < header_size or offset + size > end:
+            return
+        yield box_type, offset + header_size, size - header_size
+        offset += size
+
+
+def _find_box(f: BinaryIO, offset: int, end: int, box_type: bytes) -> Optional[Tuple[int, int]]:
+    """Find the first child box of a type; returns (payload_offset, payload_size)."""
+    for child_type, start, size in _iter_boxes(f, offset, end):
+        if child_type == box_type:
+            return start, size
+    return None
+
+
+def _find_path(f: BinaryIO, offset: int, end: int, *path: bytes) -> Optional[Tuple[int, int]]:
+    """Follow a chain of box types down from a container."""
+    box = (offset, end - offset)
+    for box_type in path:
+        box = _find_box(f, box[0], box[0] + box[1], box_type)
+        if box is None:
+            return None
+    return box
+
+
+def _read_payload(f: BinaryIO, box: Tuple[int, int]) -> bytes:
+    start, size = box
+    if size > _MAX_READ:
+        raise ValueError("box too large")
+    f.seek(start)
+    return f.read(size)
+
+
+def _dimensions_from_moov(f: BinaryIO, offset: int, end: int) -> Optional[Tuple[int, int]]:
+    for box_type, start, size in _iter_boxes(f, offset, end):
+        if box_type != b"trak":
+            continue
+        trak_end = start + size
+
+        hdlr = _find_path(f, start, trak_end, b"mdia", b"hdlr")
+        if hdlr is None:
+            continue
+        # version/flags (4), pre_defined (4), handler_type (4)
+        if _read_payload(f, hdlr)[8:12] != b"vide":
+            continue
+
+        stsd = _find_path(f, start, trak_end, b"mdia", b"minf", b"stbl", b"stsd")
+        if stsd is not None:
+            data = _read_payload(f, stsd)
+            # version/flags (4), entry_count (4), then the first sample entry:
+            # size (4), format (4), reserved (6), data_reference_index (2),
+            # pre_defined/reserved (16), width (2), height (2)
+            if len(data) >= 44:
+                width, height = _DIMENSIONS_16.unpack_from(data, 40)
+                if width and height:
+                    return width, height
+
+        tkhd = _find_box(f, start, trak_end, b"tkhd")
+        if tkhd is not None:
+            data = _read_payload(f, tkhd)
+            # width and height are the last two 16.16 fixed-point fields
+            if len(data) >= 84:
+                width, height = _DIMENSIONS_FIXED.unpack_from(data, len(data) - 8)
+                if width >> 16 and height >> 16:
+                    return width >> 16, height >> 16
+    return None
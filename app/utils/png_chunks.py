@@ -1,80 +1,148 @@
 """Utility functions for reading PNG metadata and text chunks."""
 
+import mmap
+import struct
 import zlib
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Tuple
+
+_TEXT_CHUNK_TYPES = (b"tEXt", b"zTXt", b"iTXt")
+_TEXT_KEYS = ("parameters", "comment", "description")
+_CHUNK_HEADER = struct.Struct(">I4s")
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# Signature, then the IHDR chunk header and its width/height fields
+_IHDR_PREFIX = struct.Struct(">8sI4sII")
+
+# PNG keywords are 1-79 bytes, followed by a NUL separator
+_MAX_KEYWORD = 79
+
+# Upper bound on inflated zTXt text; larger payloads are skipped, not read
+_MAX_INFLATED_TEXT = 1 << 20
+
+
+def read_png_dimensions(png_path: Path) -> Optional[Tuple[int, int]]:
+    """Return (width, height) from a PNG's IHDR chunk, or None if not a PNG.
+
+    The PNG spec requires IHDR to be the first chunk, so this is a single
+    24-byte read rather than opening the image with Pillow.
+    """
+    try:
+        with open(png_path, "rb") as f:
+            head = f.read(_IHDR_PREFIX.size)
+    except OSError:
+        return None
+    if len(head) < _IHDR_PREFIX.size:
+        return None
+    sig, _, ctype, width, height = _IHDR_PREFIX.unpack(head)
+    if sig != _PNG_SIGNATURE or ctype != b"IHDR" or not width or not height:
+        return None
+    return width, height
 
 
 def read_png_parameters_text(png_path: Path, max_bytes: int = 2_000_000) -> Optional[str]:
     """
     Best-effort parse of PNG tEXt/zTXt/iTXt chunks to extract a 'parameters' text blob
     (e.g., Automatic1111 / ComfyUI). Returns the text payload if found; otherwise None.
+
+    The file is memory-mapped, so only the pages holding chunk headers and
+    text chunks are touched; image data and CRCs are skipped over, and text
+    chunks are only copied out if their keyword is one we want. CRCs are
+    deliberately not verified: a corrupt text chunk at worst yields garbled
+    text, which the caller treats as unparseable.
+    A 'parameters' chunk is returned as soon as it is found, otherwise the
+    last 'comment'/'description' chunk is used. max_bytes caps how much
+    chunk data is read.
     """
     try:
-        with open(png_path, "rb") as f:
-            sig = f.read(8)
-            if sig != b"\x89PNG\r\n\x1a\n":
+        with open(png_path, "rb") as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm[:8] != _PNG_SIGNATURE:
                 return None
+            size = len(mm)
+            pos = 8
             read_total = 8
             param_text = None
-            while True:
-                if read_total > max_bytes:
-                    break
-                len_bytes = f.read(4)
-                if len(len_bytes) < 4:
-                    break
-                length = int.from_bytes(len_bytes, "big")
-                ctype = f.read(4)
-                if len(ctype) < 4:
-                    break
-                data = f.read(length)
-                if len(data) < length:
-                    break
-                _crc = f.read(4)
-                read_total += 12 + length
-                if ctype in (b"tEXt", b"zTXt", b"iTXt"):
-                    try:
-                        if ctype == b"tEXt":
-                            # keyword\0text
-                            if b"\x00" in data:
-                                keyword, text = data.split(b"\x00", 1)
-                                key = keyword.decode("latin-1", "ignore").strip().lower()
-                                if key in ("parameters", "comment", "description"):
-                                    t = text.decode("utf-8", "ignore").strip()
-                                    if t:
-                                        param_text = t
-                        elif ctype == b"zTXt":
-                            # keyword\0compression_method\0 compressed_text
-                            if b"\x00" in data:
-                                parts = data.split(b"\x00", 2)
-                                if len(parts) >= 3:
-                                    keyword = parts[0].decode("latin-1", "ignore").strip().lower()
-                                    comp_method = parts[1][:1] if parts[1] else b"\x00"
-                                    comp_data = parts[2]
-                                    if comp_method == b"\x00":  # zlib/deflate
-                                        try:
-                                            txt = zlib.decompress(comp_data).decode("utf-8", "ignore").strip()
-                                            if keyword in ("parameters", "comment", "description") and txt:
-                                                param_text = txt
-                                        except Exception:
-                                            pass
-                        elif ctype == b"iTXt":
-                            # keyword\0 compression_flag\0 compression_method\0 language_tag\0 translated_keyword\0 text
-                            # We handle only uncompressed (compression_flag==0)
-                            parts = data.split(b'\x00', 5)
-                            if len(parts) >= 6:
-                                keyword = parts[0].decode("utf-8", "ignore").strip().lower()
-                                comp_flag = parts[1][:1] if parts[1] else b"\x00"
-                                # parts[2]=comp_method, parts[3]=language_tag, parts[4]=translated_keyword
-                                text = parts[5]
-                                if comp_flag == b"\x00":
-                                    t = text.decode("utf-8", "ignore").strip()
-                                    if keyword in ("parameters", "comment", "description") and t:
-                                        param_text = t
-                    except Exception:
-                        pass
+            while read_total <= max_bytes and pos + 8 <= size:
+                length, ctype = _CHUNK_HEADER.unpack_from(mm, pos)
+                pos += 8
+                read_total += 8
                 if ctype == b"IEND":
                     break
+                if ctype in _TEXT_CHUNK_TYPES:
+                    if pos + length > size:
+                        break
+                    # Check the keyword in place, so other text chunks (e.g.
+                    # ComfyUI's large 'workflow' and 'prompt') are never copied
+                    nul = mm.find(b"\x00", pos, min(pos + length, pos + _MAX_KEYWORD + 1))
+                    if nul < 0 or mm[pos:nul].decode("latin-1").strip().lower() not in _TEXT_KEYS:
+                        pos += length + 4
+                        continue
+                    read_total += length + 4
+                    entry = _decode_text_chunk(ctype, mm[pos:pos + length])
+                    if entry is not None:
+                        key, text = entry
+                        if key == "parameters":
+                            return text
+                        param_text = text
+                # Skip the data (already copied for text chunks) and the CRC
+                pos += length + 4
             return param_text
     except Exception:
-        return None
\ No newline at end of file
+        return None
+
+
+def _decode_text_chunk(ctype: bytes, data: bytes) -> Optional[Tuple[str, str]]:
+    """Decode a text chunk to (keyword, text) if it holds one of _TEXT_KEYS."""
+    try:
+        if ctype == b"tEXt":
+            # keyword\0text
+            if b"\x00" in data:
+                keyword, text = data.split(b"\x00", 1)
+                key = keyword.decode("latin-1", "ignore").strip().lower()
+                if key in _TEXT_KEYS:
+                    t = text.decode("utf-8", "ignore").strip()
+                    if t:
+                        return key, t
+        elif ctype == b"zTXt":
+            # keyword\0compression_method\0 compressed_text
+            if b"\x00" in data:
+                parts = data.split(b"\x00", 2)
+                if len(parts) >= 3:
+                    keyword = parts[0].decode("latin-1", "ignore").strip().lower()
+                    comp_method = parts[1][:1] if parts[1] else b"\x00"
+                    comp_data = parts[2]
+                    if comp_method == b"\x00" and keyword in _TEXT_KEYS:  # zlib/deflate
+                        try:
+                            txt = _inflate_text(comp_data)
+                            if txt:
+                                return keyword, txt
+                        except Exception:
+                            pass
+        elif ctype == b"iTXt":
+            # keyword\0 compression_flag\0 compression_method\0 language_tag\0 translated_keyword\0 text
+            # We handle only uncompressed (compression_flag==0)
+            parts = data.split(b'\x00', 5)
+            if len(parts) >= 6:
+                keyword = parts[0].decode("utf-8", "ignore").strip().lower()
+                comp_flag = parts[1][:1] if parts[1] else b"\x00"
+                # parts[2]=comp_method, parts[3]=language_tag, parts[4]=translated_keyword
+                text = parts[5]
+                if comp_flag == b"\x00":
+                    t = text.decode("utf-8", "ignore").strip()
+                    if keyword in _TEXT_KEYS and t:
+                        return keyword, t
+    except Exception:
+        pass
+    return None
+
+
+def _inflate_text(comp_data: bytes) -> Optional[str]:
+    """Inflate a zTXt payload, giving up past _MAX_INFLATED_TEXT bytes.
+
+    Caps the output so a small chunk can't expand into gigabytes of memory.
+    """
+    d = zlib.decompressobj()
+    raw = d.decompress(comp_data, _MAX_INFLATED_TEXT)
+    if d.unconsumed_tail:
+        return None
+    return raw.decode("utf-8", "ignore").strip()
@@ -0,0 +1,42 @@
+"""Process pools for the app's CPU-bound work."""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# Multi-worker servers split the cores between their workers' pools through
+# this variable; see gunicorn.conf.py and app.main.cli_main.
+POOL_WORKERS_ENV_VAR = "MEDIA_SCORING_POOL_WORKERS"
+
+
+def process_pool_workers() -> int:
+    """Number of processes for each of this server process's pools.
+
+    One per core for a single server process. When several server processes
+    share the machine, each gets its share of the cores from
+    MEDIA_SCORING_POOL_WORKERS, so pools don't multiply to workers x cores.
+    """
+    try:
+        workers = int(os.environ.get(POOL_WORKERS_ENV_VAR, ""))
+    except ValueError:
+        workers = 0
+    return workers if workers > 0 else (os.cpu_count() or 1)
+
+
+def pool_workers_per_server(server_workers: int) -> int:
+    """Pool size for each of server_workers processes sharing this machine."""
+    return max(1, (os.cpu_count() or 1) // max(1, server_workers))
+
+
+def new_process_pool() -> ProcessPoolExecutor:
+    """Start a process pool sized for this server process.
+
+    Workers come from a forkserver where the platform has one: forking the
+    threaded server directly can copy a lock some other thread holds at that
+    moment into the child, which then deadlocks on it.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+    else:
+        context = None
+    return ProcessPoolExecutor(max_workers=process_pool_workers(), mp_context=context)
@@ -0,0 +1,38 @@
+"""Gunicorn configuration for serving the app with several worker processes.
+
+    gunicorn -c gunicorn.conf.py
+
+Each worker is its own process with its own GIL, so CPU-heavy requests
+(image metadata, zip exports, on-demand thumbnails) in one worker don't
+stall the others. Settings come from config/config.yml, as for run.py.
+"""
+
+import os
+
+from app.settings import Settings
+from app.utils.process_pool import POOL_WORKERS_ENV_VAR, pool_workers_per_server
+
+_settings = Settings.load_from_yaml()
+
+# Each worker builds its own app (and scans the media directory) after the
+# fork; see app.main.create_app_from_env.
+wsgi_app = "app.main:create_app_from_env()"
+worker_class = "uvicorn.workers.UvicornWorker"
+
+bind = f"{_settings.host}:{_settings.port}"
+
+# The heavy lifting (thumbnails, workflow extraction) runs in process pools,
+# so a few workers are enough to keep requests flowing; the cores are split
+# between the workers' pools rather than each worker taking all of them.
+workers = int(os.environ.get("WEB_CONCURRENCY", min(4, os.cpu_count() or 1)))
+# Workers are forked from this process, so they inherit the variable
+os.environ.setdefault(POOL_WORKERS_ENV_VAR, str(pool_workers_per_server(workers)))
+
+# Not preloaded: the app starts threads, process pools and SQLite
+# connections at startup, none of which survive a fork.
+preload_app = False
+
+# Match the single-process server: keep idle connections for the UI's
+# bursts of API calls, and leave the access log off unless configured.
+keepalive = 30
+accesslog = "-" if _settings.access_log else None
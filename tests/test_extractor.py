@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Tests for locating the workflow extractor script.
+"""
+
+from unittest import mock
+
+import pytest
+from app.services import extractor
+
+
+@pytest.fixture
+def project_root(tmp_path):
+    """Point the extractor module at a throwaway project layout."""
+    module_file = tmp_path / "app" / "services" / "extractor.py"
+    extractor.get_extractor_script_path.cache_clear()
+    with mock.patch.object(extractor, "__file__", str(module_file)):
+        yield tmp_path
+    extractor.get_extractor_script_path.cache_clear()
+
+
+def test_shipped_script_is_found():
+    extractor.get_extractor_script_path.cache_clear()
+    script = extractor.get_extractor_script_path()
+    assert script.exists()
+    assert script.name == "extract_comfyui_workflow.py"
+
+
+def test_tools_copy_is_used_without_a_root_copy(project_root):
+    (project_root / "tools").mkdir()
+    (project_root / "tools" / "extract_comfyui_workflow.py").touch()
+    assert extractor.get_extractor_script_path() == project_root / "tools" / "extract_comfyui_workflow.py"
+
+
+def test_root_copy_takes_precedence(project_root):
+    (project_root / "tools").mkdir()
+    (project_root / "tools" / "extract_comfyui_workflow.py").touch()
+    (project_root / "extract_comfyui_workflow.py").touch()
+    assert extractor.get_extractor_script_path() == project_root / "extract_comfyui_workflow.py"
+
+
+def test_missing_script_reports_tools_path(project_root):
+    script = extractor.get_extractor_script_path()
+    assert script == project_root / "tools" / "extract_comfyui_workflow.py"
+    assert not script.exists()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Tests for union-pattern file discovery and directory summaries.
+"""
+
+import os
+
+import pytest
+from app.services.files import match_union_pattern, summarize_subdirectory
+
+
+@pytest.fixture
+def media_dir(tmp_path):
+    for name in ("b.mp4", "a.png", "c.jpg", "notes.txt", ".hidden.mp4"):
+        (tmp_path / name).write_bytes(b"x")
+    (tmp_path / "folder.mp4").mkdir()
+    return tmp_path
+
+
+def test_matches_files_sorted_by_name(media_dir):
+    """Test that only regular files matching an alternative are returned, sorted."""
+    names = [p.name for p in match_union_pattern(media_dir, "*.mp4|*.png|*.jpg")]
+    assert names == ["a.png", "b.mp4", "c.jpg"]
+
+
+def test_non_suffix_patterns(media_dir):
+    """Test patterns that need the regex matcher rather than the suffix check."""
+    assert [p.name for p in match_union_pattern(media_dir, "b*|note?.txt")] == ["b.mp4", "notes.txt"]
+    assert [p.name for p in match_union_pattern(media_dir, ".*.mp4")] == [".hidden.mp4"]
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink"), reason="symlinks not supported")
+def test_follows_symlinks_to_files(media_dir, tmp_path_factory):
+    """Test that symlinked media is listed but links to directories are not."""
+    outside = tmp_path_factory.mktemp("outside")
+    (outside / "linked.mp4").write_bytes(b"x")
+    os.symlink(outside / "linked.mp4", media_dir / "linked.mp4")
+    os.symlink(outside, media_dir / "dirlink.mp4")
+    names = [p.name for p in match_union_pattern(media_dir, "*.mp4")]
+    assert names == ["b.mp4", "linked.mp4"]
+
+
+def test_summarize_subdirectory(media_dir):
+    """Test media counting and the visible-subdirectory check."""
+    # folder.mp4 is a directory: not counted, but it is a child
+    assert summarize_subdirectory(media_dir) == (4, True)
+    
+    only_hidden = media_dir / "folder.mp4"
+    (only_hidden / ".cache").mkdir()
+    (only_hidden / "clip.MP4").write_bytes(b"x")
+    assert summarize_subdirectory(only_hidden) == (1, False)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
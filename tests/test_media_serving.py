@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""Tests for serving media files found by a scan."""
+
+import os
+import sys
+from pathlib import Path
+
+# Add the parent directory to Python path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import create_app
+from app.settings import Settings
+
+
+@pytest.fixture
+def client(tmp_path):
+    """Serve a media directory whose pattern reaches into subdirectories."""
+    media = tmp_path / "media"
+    (media / "sub").mkdir(parents=True)
+    outside = tmp_path / "outside"
+    outside.mkdir()
+    (media / "a.mp4").write_bytes(b"top")
+    (media / "sub" / "a.mp4").write_bytes(b"sub")
+    (outside / "secret.mp4").write_bytes(b"secret")
+    os.symlink(outside, media / "link")
+
+    settings = Settings(dir=media, pattern="*.mp4|sub/*.mp4|link/*.mp4",
+                        enable_database=False, generate_thumbnails=False)
+    return TestClient(create_app(settings))
+
+
+def test_same_name_in_subdirectory_does_not_shadow(client):
+    for prefix in ("/media/", "/download/"):
+        assert client.get(prefix + "a.mp4").content == b"top"
+        assert client.get(prefix + "sub/a.mp4").content == b"sub"
+
+
+def test_file_under_symlinked_directory_is_not_served(client):
+    for prefix in ("/media/", "/download/"):
+        assert client.get(prefix + "secret.mp4").status_code == 404
+        assert client.get(prefix + "link/secret.mp4").status_code == 403
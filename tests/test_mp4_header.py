@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Tests for the MP4 box header parser.
+"""
+
+import struct
+
+import pytest
+from app.utils.mp4_header import read_mp4_dimensions
+
+
+def box(box_type, payload=b""):
+    return struct.pack(">I4s", 8 + len(payload), box_type) + payload
+
+
+def large_box(box_type, payload=b""):
+    return struct.pack(">I4sQ", 1, box_type, 16 + len(payload)) + payload
+
+
+def hdlr(handler_type):
+    return box(b"hdlr", b"\x00" * 8 + handler_type + b"\x00" * 12 + b"\x00")
+
+
+def tkhd(width, height, version=0):
+    times = 32 if version == 1 else 20
+    payload = bytes([version, 0, 0, 0]) + b"\x00" * times + b"\x00" * 52
+    payload += struct.pack(">II", width << 16, height << 16)
+    return box(b"tkhd", payload)
+
+
+def stsd(width, height):
+    entry = b"\x00" * 6 + b"\x00\x01" + b"\x00" * 16 + struct.pack(">HH", width, height) + b"\x00" * 50
+    entry = box(b"avc1", entry)
+    return box(b"stsd", b"\x00" * 4 + struct.pack(">I", 1) + entry)
+
+
+def trak(handler_type, tkhd_box, stsd_box=b""):
+    stbl = box(b"stbl", stsd_box)
+    mdia = box(b"mdia", hdlr(handler_type) + box(b"minf", stbl))
+    return box(b"trak", tkhd_box + mdia)
+
+
+def write_mp4(tmp_path, *top_level):
+    path = tmp_path / "clip.mp4"
+    path.write_bytes(b"".join(top_level))
+    return path
+
+
+def test_reads_coded_size_from_video_track(tmp_path):
+    """Test that the video track's sample entry size is used, not the audio track."""
+    moov = box(b"moov", trak(b"soun", tkhd(0, 0)) + trak(b"vide", tkhd(1280, 720), stsd(1920, 1080)))
+    path = write_mp4(tmp_path, box(b"ftyp", b"isom"), box(b"mdat", b"\x00" * 4096), moov)
+    assert read_mp4_dimensions(path) == (1920, 1080)
+
+
+def test_falls_back_to_track_header(tmp_path):
+    """Test that tkhd (v0 and v1) is used when there is no sample description."""
+    path = write_mp4(tmp_path, box(b"moov", trak(b"vide", tkhd(640, 360))))
+    assert read_mp4_dimensions(path) == (640, 360)
+
+    path = write_mp4(tmp_path, box(b"moov", trak(b"vide", tkhd(720, 1280, version=1))))
+    assert read_mp4_dimensions(path) == (720, 1280)
+
+
+def test_handles_64bit_box_sizes(tmp_path):
+    """Test that boxes with a 64-bit size are walked correctly."""
+    moov = box(b"moov", trak(b"vide", tkhd(0, 0), stsd(320, 240)))
+    path = write_mp4(tmp_path, large_box(b"mdat", b"\x00" * 100), moov)
+    assert read_mp4_dimensions(path) == (320, 240)
+
+
+def test_returns_none_for_unparseable_files(tmp_path):
+    """Test that non-MP4 and truncated files give None."""
+    path = tmp_path / "fake.mp4"
+    path.write_bytes(b"test content\n")
+    assert read_mp4_dimensions(path) is None
+
+    truncated = box(b"moov", trak(b"vide", tkhd(640, 360)))[:-20]
+    assert read_mp4_dimensions(write_mp4(tmp_path, truncated)) is None
+
+    assert read_mp4_dimensions(tmp_path / "missing.mp4") is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
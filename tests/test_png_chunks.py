@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Tests for the PNG text chunk and header parser.
+"""
+
+import struct
+import zlib
+
+import pytest
+from app.utils.png_chunks import read_png_dimensions, read_png_parameters_text
+
+
+SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def chunk(chunk_type, data=b""):
+    crc = zlib.crc32(chunk_type + data)
+    return struct.pack(">I", len(data)) + chunk_type + data + struct.pack(">I", crc)
+
+
+def ihdr(width=64, height=48):
+    return chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+
+
+def text(keyword, value):
+    return chunk(b"tEXt", keyword.encode("latin-1") + b"\x00" + value.encode("utf-8"))
+
+
+def ztxt(keyword, value):
+    return chunk(b"zTXt", keyword.encode("latin-1") + b"\x00\x00" + zlib.compress(value.encode("utf-8")))
+
+
+def itxt(keyword, value, compressed=False):
+    flag = b"\x01" if compressed else b"\x00"
+    payload = zlib.compress(value.encode("utf-8")) if compressed else value.encode("utf-8")
+    return chunk(b"iTXt", keyword.encode("utf-8") + b"\x00" + flag + b"\x00" + b"en\x00\x00" + payload)
+
+
+def png(*chunks):
+    return SIGNATURE + ihdr() + b"".join(chunks) + chunk(b"IDAT", b"\x00" * 32) + chunk(b"IEND")
+
+
+def write(tmp_path, data, name="image.png"):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return path
+
+
+@pytest.mark.parametrize("make_chunk", [text, ztxt, itxt])
+def test_parameters_from_each_text_chunk_type(tmp_path, make_chunk):
+    path = write(tmp_path, png(make_chunk("parameters", "a cat, 20 steps")))
+    assert read_png_parameters_text(path) == "a cat, 20 steps"
+
+
+def test_keyword_is_case_insensitive(tmp_path):
+    path = write(tmp_path, png(text("Parameters", "prompt")))
+    assert read_png_parameters_text(path) == "prompt"
+
+
+def test_parameters_win_over_comment(tmp_path):
+    path = write(tmp_path, png(text("comment", "first"), text("parameters", "wanted"), text("comment", "later")))
+    assert read_png_parameters_text(path) == "wanted"
+
+
+def test_last_comment_or_description_is_the_fallback(tmp_path):
+    path = write(tmp_path, png(text("comment", "first"), text("description", "second")))
+    assert read_png_parameters_text(path) == "second"
+
+
+def test_unwanted_text_chunks_are_skipped(tmp_path):
+    workflow = '{"nodes": [' + ", ".join(["{}"] * 50_000) + "]}"
+    path = write(tmp_path, png(text("workflow", workflow), ztxt("prompt", workflow), text("parameters", "after")))
+    assert read_png_parameters_text(path) == "after"
+
+
+def test_skipped_chunks_do_not_count_towards_max_bytes(tmp_path):
+    path = write(tmp_path, png(text("workflow", "x" * 10_000), text("parameters", "after")))
+    assert read_png_parameters_text(path, max_bytes=1_000) == "after"
+
+
+def test_max_bytes_stops_the_scan(tmp_path):
+    # The chunk that crosses the limit is still used; nothing after it is read
+    path = write(tmp_path, png(text("comment", "x" * 10_000), text("parameters", "too far")))
+    assert read_png_parameters_text(path, max_bytes=1_000) == "x" * 10_000
+
+
+def test_keyword_longer_than_allowed_is_ignored(tmp_path):
+    path = write(tmp_path, png(text("parameters" + "x" * 80, "nope")))
+    assert read_png_parameters_text(path) is None
+
+
+def test_compressed_itxt_is_ignored(tmp_path):
+    path = write(tmp_path, png(itxt("parameters", "compressed", compressed=True)))
+    assert read_png_parameters_text(path) is None
+
+
+def test_oversized_ztxt_is_not_inflated(tmp_path):
+    path = write(tmp_path, png(ztxt("parameters", "a" * (2 << 20))))
+    assert read_png_parameters_text(path) is None
+
+
+def test_text_after_iend_is_ignored(tmp_path):
+    path = write(tmp_path, png() + text("parameters", "trailing"))
+    assert read_png_parameters_text(path) is None
+
+
+def test_truncated_text_chunk(tmp_path):
+    data = png(text("comment", "kept"), text("parameters", "cut off here"))
+    cut = data.index(b"cut off")
+    path = write(tmp_path, data[:cut])
+    assert read_png_parameters_text(path) == "kept"
+
+
+def test_truncated_chunk_header(tmp_path):
+    data = SIGNATURE + ihdr() + text("parameters", "whole")
+    path = write(tmp_path, data + b"\x00\x00")
+    assert read_png_parameters_text(path) == "whole"
+
+
+@pytest.mark.parametrize("data", [b"", b"GIF89a", b"\x89PNG\r\n\x1a", b"not a png at all"])
+def test_not_a_png(tmp_path, data):
+    path = write(tmp_path, data)
+    assert read_png_parameters_text(path) is None
+    assert read_png_dimensions(path) is None
+
+
+def test_missing_file(tmp_path):
+    assert read_png_parameters_text(tmp_path / "missing.png") is None
+    assert read_png_dimensions(tmp_path / "missing.png") is None
+
+
+def test_dimensions(tmp_path):
+    path = write(tmp_path, SIGNATURE + ihdr(1920, 1080) + chunk(b"IEND"))
+    assert read_png_dimensions(path) == (1920, 1080)
+
+
+def test_dimensions_need_ihdr_first(tmp_path):
+    path = write(tmp_path, SIGNATURE + text("parameters", "x") + ihdr())
+    assert read_png_dimensions(path) is None
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""Test the SQLite score index."""
+
+import json
+import os
+import sqlite3
+import stat
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the app directory to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from unittest import mock
+
+from app.services.score_store import ScoreStore, INDEX_DB_NAME, _on_network_filesystem
+from app.services.files import get_score_store_for, read_score, read_favourite, read_scores
+
+
+def test_score_store_roundtrip():
+    """Test that scores and favourites are stored independently."""
+    print("Testing score store roundtrip...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store = ScoreStore(Path(temp_dir))
+        try:
+            assert store.get("a.mp4") is None
+
+            store.set_score("a.mp4", 4, "2025-01-01T12:00:00")
+            assert store.get("a.mp4") == (4, False)
+
+            # Setting favourite must keep the score
+            store.set_favourite("a.mp4", True, "2025-01-01T12:00:01")
+            assert store.get("a.mp4") == (4, True)
+
+            # Setting score must keep the favourite
+            store.set_score("a.mp4", -1, "2025-01-01T12:00:02")
+            assert store.get("a.mp4") == (-1, True)
+
+            # Favouriting an unscored file defaults its score to 0
+            store.set_favourite("b.png", True, "2025-01-01T12:00:03")
+            assert store.get_all() == {"a.mp4": (-1, True), "b.png": (0, True)}
+
+            # Batched scores keep favourites and add new entries
+            store.set_scores({"a.mp4": 2, "c.jpg": 5}, "2025-01-01T12:00:04")
+            assert store.get_all() == {"a.mp4": (2, True), "b.png": (0, True), "c.jpg": (5, False)}
+        finally:
+            store.close()
+
+        # Entries survive reopening the database
+        store = ScoreStore(Path(temp_dir))
+        try:
+            assert store.get_all() == {"a.mp4": (2, True), "b.png": (0, True), "c.jpg": (5, False)}
+        finally:
+            store.close()
+
+    print("✅ Score store roundtrip works")
+
+
+def test_score_store_sees_other_connections():
+    """Test that writes from another connection are picked up."""
+    print("\nTesting score store reload on external writes...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        first = ScoreStore(Path(temp_dir))
+        second = ScoreStore(Path(temp_dir))
+        try:
+            before = second.version()
+            first.set_score("a.mp4", 3, "2025-01-01T12:00:00")
+            assert second.version() != before
+            assert second.get("a.mp4") == (3, False)
+
+            second.set_favourite("a.mp4", True, "2025-01-01T12:00:01")
+            assert first.get("a.mp4") == (3, True)
+        finally:
+            first.close()
+            second.close()
+
+    print("✅ External writes are picked up")
+
+
+def test_network_filesystem_detection():
+    """Test that paths on network mounts are recognised, so WAL is skipped."""
+    print("\nTesting network filesystem detection...")
+
+    mounts = (
+        "/dev/sda1 / ext4 rw 0 0\n"
+        "//nas/media /mnt/nas cifs rw 0 0\n"
+        "server:/export /mnt/nas/local\\040copy ext4 rw 0 0\n"
+    )
+    with mock.patch("builtins.open", mock.mock_open(read_data=mounts)), \
+         mock.patch.object(Path, "resolve", lambda self: self):
+        assert _on_network_filesystem(Path("/mnt/nas/photos/.scores"))
+        assert _on_network_filesystem(Path("/mnt/nas"))
+        assert not _on_network_filesystem(Path("/mnt/nas/local copy/.scores"))
+        assert not _on_network_filesystem(Path("/mnt/nasty/.scores"))
+        assert not _on_network_filesystem(Path("/home/user/.scores"))
+
+    print("✅ Network filesystems detected")
+
+
+def test_own_writes_do_not_rescan_sidecars():
+    """Test that journal files from our own commits don't trigger sidecar rescans."""
+    print("\nTesting sidecar rescans with a rollback journal...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        scores_dir = Path(temp_dir)
+        # The rollback journal (used on network shares) is created and
+        # deleted next to the index on every commit
+        with mock.patch("app.services.score_store._on_network_filesystem", return_value=True):
+            store = ScoreStore(scores_dir)
+        try:
+            for i in range(3):
+                store.set_score("a.mp4", i, "2025-01-01T12:00:00")
+                with mock.patch.object(ScoreStore, "_import_sidecars") as rescan:
+                    assert store.get_all() == {"a.mp4": (i, False)}
+                assert not rescan.called
+
+            # A sidecar dropped in by another tool is still picked up
+            (scores_dir / "b.mp4.json").write_text(json.dumps({"score": 4}))
+            assert store.get_all() == {"a.mp4": (2, False), "b.mp4": (4, False)}
+        finally:
+            store.close()
+
+    print("✅ Own commits don't rescan sidecars")
+
+
+def test_legacy_sidecar_import():
+    """Test that existing JSON sidecars are imported into the index."""
+    print("\nTesting legacy sidecar import...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        media_dir = Path(temp_dir)
+        (media_dir / "old.mp4").touch()
+        (media_dir / "new.mp4").touch()
+        (media_dir / "bad.mp4").touch()
+
+        scores_dir = media_dir / ".scores"
+        scores_dir.mkdir()
+        (scores_dir / "old.mp4.json").write_text(json.dumps({
+            "file": "old.mp4",
+            "score": 3,
+            "favourite": True,
+            "updated": "2025-01-01T12:00:00",
+        }))
+        (scores_dir / "bad.mp4.json").write_text("{not json")
+
+        assert read_score(media_dir / "old.mp4") == 3
+        assert read_favourite(media_dir / "old.mp4") is True
+        assert read_score(media_dir / "new.mp4") is None
+        assert read_score(media_dir / "bad.mp4") is None
+        assert (scores_dir / INDEX_DB_NAME).exists()
+
+        # The index wins over a sidecar once a file has an entry
+        get_score_store_for(media_dir).set_score("old.mp4", 5, "2025-01-02T12:00:00")
+        results = read_scores([media_dir / "bad.mp4", media_dir / "new.mp4", media_dir / "old.mp4"])
+        assert results == [(None, False), (None, False), (5, True)]
+
+        # Sidecars written while the store is open are picked up by listings
+        (scores_dir / "new.mp4.json").write_text(json.dumps({"file": "new.mp4", "score": 2}))
+        results = read_scores([media_dir / "new.mp4"])
+        assert results == [(2, False)]
+
+    print("✅ Legacy sidecars imported")
+
+
+def test_read_only_scores_directory():
+    """Test that scores in a scores directory we can't write still read back."""
+    print("\nTesting read-only scores directory...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        media_dir = Path(temp_dir)
+        scores_dir = media_dir / ".scores"
+        scores_dir.mkdir()
+        store = ScoreStore(scores_dir)
+        store.set_score("indexed.mp4", 2, "2025-01-01T12:00:00")
+        store.close()
+        (scores_dir / "legacy.mp4.json").write_text(json.dumps({"score": 4, "favourite": True}))
+
+        mode = scores_dir.stat().st_mode
+        os.chmod(scores_dir, stat.S_IRUSR | stat.S_IXUSR)
+        try:
+            # root ignores directory permissions, so also make the write-mode
+            # setup fail the way it does for an unprivileged user
+            failing_setup = mock.patch.object(
+                ScoreStore, "_setup_database",
+                side_effect=sqlite3.OperationalError("attempt to write a readonly database"),
+            )
+            with failing_setup:
+                store = ScoreStore(scores_dir)
+            try:
+                assert store.read_only
+                assert store.get_all() == {"indexed.mp4": (2, False), "legacy.mp4": (4, True)}
+                try:
+                    store.set_score("indexed.mp4", 5, "2025-01-02T12:00:00")
+                    assert False, "write to a read-only store should fail"
+                except PermissionError:
+                    pass
+                assert store.get("indexed.mp4") == (2, False)
+            finally:
+                store.close()
+        finally:
+            os.chmod(scores_dir, mode)
+
+    print("✅ Read-only scores directories are readable")
+
+
+if __name__ == "__main__":
+    try:
+        test_score_store_roundtrip()
+        test_score_store_sees_other_connections()
+        test_network_filesystem_detection()
+        test_own_writes_do_not_rescan_sidecars()
+        test_legacy_sidecar_import()
+        test_read_only_scores_directory()
+
+        print("\n" + "=" * 50)
+        print("🎉 All score store tests passed!")
+
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
+        sys.exit(1)
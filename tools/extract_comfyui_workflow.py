@@ -7,6 +7,29 @@ import subprocess
 import sys
 from typing import Any, Dict, List, Tuple, Union
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def json_loads(text: str) -> Any:
+    """json.loads, via orjson when installed (workflow blobs can be large)."""
+    if orjson is not None:
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass  # e.g. NaN/Infinity, which only the stdlib accepts
+    return json.loads(text)
+
+def json_pretty(obj: Any) -> str:
+    """Pretty-print like json.dumps(indent=2, ensure_ascii=False), via orjson when installed."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode("utf-8")
+        except TypeError:
+            pass  # e.g. integers wider than 64 bits
+    return json.dumps(obj, indent=2, ensure_ascii=False)
+
 def run_ffprobe(path: str) -> Dict[str, Any]:
     cmd = [
         "ffprobe", "-v", "error",
@@ -16,7 +39,7 @@ def run_ffprobe(path: str) -> Dict[str, Any]:
     ]
     try:
         cp = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        return json.loads(cp.stdout)
+        return json_loads(cp.stdout)
     except FileNotFoundError:
         print("ERROR: ffprobe not found. Please install ffmpeg (which includes ffprobe).", file=sys.stderr)
         sys.exit(2)
@@ -104,13 +127,13 @@ def looks_like_comfyui_workflow(obj: Any) -> bool:
 
 def decode_json(text: str) -> Union[Any, None]:
     try:
-        return json.loads(text)
+        return json_loads(text)
     except Exception:
         # Sometimes it's double-encoded
         try:
             unesc = try_unescape_json_string(text)
             if unesc is not None:
-                return json.loads(unesc)
+                return json_loads(unesc)
         except Exception:
             pass
     return None
@@ -128,10 +151,10 @@ def select_workflow_payloads(candidates: List[Tuple[str, str]]) -> List[Tuple[st
         # If nested, try to find the actual workflow dict to save
         workflow_obj = extract_workflow_dict(obj)
         if workflow_obj is not None:
-            pretty = json.dumps(workflow_obj, indent=2, ensure_ascii=False)
+            pretty = json_pretty(workflow_obj)
             chosen.append((src, workflow_obj, pretty))
         elif looks_like_comfyui_workflow(obj):
-            pretty = json.dumps(obj, indent=2, ensure_ascii=False)
+            pretty = json_pretty(obj)
             chosen.append((src, obj, pretty))
     return chosen
 